@@ -0,0 +1,216 @@
+"""
+Regression check and benchmark for interview answer scoring in services/ai_service.py.
+
+Scores a fixed, seeded corpus of question/answer pairs (short answers, long
+500+ word answers, and token soup that exercises prefix and substring matches)
+with both the current `evaluate_answer` and the previous quadratic version (kept
+below as a reference copy), asserts every score and feedback string is
+identical, then prints per-call timings for long answers.
+
+Run from the repository root:
+
+    python -m benchmarks.answer_relevance [--repeat N]
+"""
+import argparse
+import random
+import timeit
+
+from services.ai_service import (
+    _METRIC_RE,
+    _contains_any,
+    _split_question_and_answer,
+    evaluate_answer,
+    get_taxonomy,
+)
+from utils.tokenizer import tokenize_document
+
+QUESTIONS = [
+    "Tell me about a time you showed leadership on a project.",
+    "How do you optimize a slow SQL query?",
+    "Describe your experience with Python automation.",
+    "How do you handle communication with stakeholders?",
+    "Explain how you improved teamwork in a cross-functional team.",
+    "What digital marketing campaign are you proudest of?",
+    "Walk me through designing a scalable REST API with Docker and Kubernetes.",
+    "Why do you want this internship?",
+]
+
+VOCABULARY = (
+    "led lead leadership mentored managed ownership initiative team teamwork pair collaborate support "
+    "stakeholder stakeholders present presentation communicate communication sql query queries index indexes "
+    "join joins schema database python pandas flask fastapi script automation automated campaign funnel ctr "
+    "conversion audience docker kubernetes api apis rest design designed scalable scale built implemented "
+    "improved reduced increased delivered achieved result impact project role situation task challenge "
+    "latency throughput 30% 2x 15 minutes users revenue the and with for into over while because"
+).split()
+
+
+# Reference copy of evaluate_answer before the prefix index and hint pattern.
+def legacy_evaluate_answer(answer: str):
+    question, candidate_answer = _split_question_and_answer(answer)
+    answer_word_count = len(candidate_answer.split())
+
+    if answer_word_count < 8:
+        return {
+            "score": 25,
+            "feedback": "Insufficient answer. It is too short to assess the question properly.",
+        }
+
+    # 1) Relevance score (0..45): does the answer target the asked topic?
+    relevance_score = 20
+    relevance_note = " The answer may not be aligned with the selected question."
+    if question:
+        q_tokens = tokenize_document(question).vocabulary
+        a_tokens = tokenize_document(candidate_answer).vocabulary
+        exact_overlap = len(q_tokens & a_tokens)
+
+        # Allow close variants (e.g., "leadership" vs "led") by prefix/substring similarity.
+        fuzzy_overlap = 0
+        for qt in q_tokens:
+            if qt in a_tokens:
+                continue
+            for at in a_tokens:
+                if qt[:4] == at[:4] or qt in at or at in qt:
+                    fuzzy_overlap += 1
+                    break
+
+        overlap = exact_overlap + fuzzy_overlap
+        denom = max(1, min(len(q_tokens), 8))
+        relevance_ratio = overlap / denom
+
+        # Skill-term bonus if the asked skill itself appears in answer.
+        question_lower = question.lower()
+        answer_lower = candidate_answer.lower()
+        taxonomy = get_taxonomy()
+        question_skills = set(taxonomy.skill_matcher.find(question))
+        skill_bonus = 0
+        if question_skills and question_skills.intersection(taxonomy.skill_matcher.find(candidate_answer)):
+            skill_bonus = 0.2
+
+        # Skill-hint bonus for semantically related wording.
+        hint_bonus = 0
+        for skill_key, hints in taxonomy.skill_hints.items():
+            if skill_key in question_lower:
+                for hint in hints:
+                    if hint in answer_lower:
+                        hint_bonus = 0.45
+                        break
+                if hint_bonus:
+                    break
+
+        relevance_ratio = min(1.0, relevance_ratio + skill_bonus + hint_bonus)
+        relevance_score = int(min(45, round(relevance_ratio * 45)))
+
+        if relevance_ratio < 0.2:
+            relevance_note = " The answer is not aligned with the selected question."
+        elif relevance_ratio < 0.4:
+            relevance_note = " The answer is partially aligned with the selected question."
+        else:
+            relevance_note = " The answer is aligned with the selected question."
+
+    # 2) Completeness score (0..35): sufficient structure for interview quality.
+    answer_lower = candidate_answer.lower()
+    context_words = {"project", "role", "team", "situation", "task", "challenge"}
+    action_words = {"built", "implemented", "designed", "led", "managed", "created", "improved", "optimized"}
+    outcome_words = {"result", "impact", "improved", "reduced", "increased", "delivered", "achieved"}
+
+    completeness_score = 0
+    if _contains_any(answer_lower, context_words):
+        completeness_score += 10
+    if _contains_any(answer_lower, action_words):
+        completeness_score += 12
+    if _contains_any(answer_lower, outcome_words):
+        completeness_score += 8
+    if _METRIC_RE.search(candidate_answer):
+        completeness_score += 5
+
+    # 3) Depth score (0..20): enough detail without rewarding length alone.
+    if answer_word_count >= 70:
+        depth_score = 20
+    elif answer_word_count >= 40:
+        depth_score = 16
+    elif answer_word_count >= 25:
+        depth_score = 12
+    else:
+        depth_score = 8
+
+    score = max(20, min(100, relevance_score + completeness_score + depth_score))
+
+    # Gate the score if relevance is very low.
+    if relevance_score < 12:
+        score = min(score, 45)
+
+    if score >= 80:
+        sufficiency = "Sufficient answer for this question."
+        feedback = "Strong response with good alignment, concrete actions, and measurable impact."
+    elif score >= 60:
+        sufficiency = "Mostly sufficient, but can be improved."
+        feedback = "Answer is reasonably aligned. Add clearer outcomes and stronger specifics."
+    elif score >= 45:
+        sufficiency = "Partially sufficient."
+        feedback = "Some relevant content is present, but details and impact are limited."
+    else:
+        sufficiency = "Not sufficient for this question."
+        feedback = "Answer does not adequately address the asked question."
+
+    return {"score": score, "feedback": f"{sufficiency} {feedback}{relevance_note}"}
+
+
+def _answer(rng: random.Random, words: int):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def _soup_token(rng: random.Random):
+    return "".join(rng.choice("abcdelmnorst") for _ in range(rng.randint(3, 9)))
+
+
+def build_corpus(seed: int = 22):
+    rng = random.Random(seed)
+    corpus = []
+    for question in QUESTIONS:
+        for words in (5, 12, 40, 90, 600):
+            answer = _answer(rng, words)
+            corpus.append(f"Question: {question}\nAnswer: {answer}")
+            corpus.append(answer)
+    # Random short tokens collide on prefixes and substrings far more often than prose.
+    for _ in range(2000):
+        question = " ".join(_soup_token(rng) for _ in range(rng.randint(1, 10)))
+        answer = " ".join(_soup_token(rng) for _ in range(rng.randint(6, 80)))
+        corpus.append(f"Question: {question}\nAnswer: {answer}")
+    return corpus
+
+
+def check_corpus(corpus):
+    for raw in corpus:
+        assert evaluate_answer(raw) == legacy_evaluate_answer(raw), raw
+    return len(corpus)
+
+
+def _per_call_us(fn, number: int, repeat: int):
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    checked = check_corpus(build_corpus())
+    print(f"regression: {checked} answers scored identically")
+
+    rng = random.Random(5)
+    print(f"{'case':34} {'legacy us':>10} {'current us':>11} {'speedup':>8}")
+    for words in (100, 500, 2000):
+        question = rng.choice(QUESTIONS)
+        # A pool of distinct words, so the answer vocabulary grows with its length.
+        answer = " ".join(f"{rng.choice(VOCABULARY)}{rng.randint(0, words)}" for _ in range(words))
+        raw = f"Question: {question}\nAnswer: {answer}"
+        # Both versions share the memoized tokenization; warm it so only scoring is timed.
+        tokenize_document(answer)
+        before = _per_call_us(lambda: legacy_evaluate_answer(raw), 50, args.repeat)
+        after = _per_call_us(lambda: evaluate_answer(raw), 50, args.repeat)
+        print(f"{f'answer of {words} words':34} {before:10.2f} {after:11.2f} {before / after:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
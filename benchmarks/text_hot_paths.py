@@ -0,0 +1,203 @@
+"""
+Micro-benchmark for the text hot paths in services/ai_service.py and services/match_engine.py.
+
+Compares the precompiled, single-pass implementations against the previous
+per-call `re.*` and full-sort versions (kept below as reference copies), checks
+that both produce identical output, and prints per-call timings.
+
+Run from the repository root:
+
+    python -m benchmarks.text_hot_paths [--repeat N]
+"""
+import argparse
+import random
+import re
+import string
+import timeit
+
+from services.ai_service import (
+    RESUME_KEYWORD_STOPWORDS,
+    _BULLET_ACTION_RE,
+    _BULLET_IMPACT_RE,
+    _METRIC_RE,
+    _extract_general_keywords,
+    _score_single_bullet,
+    _tokenize,
+    _top_general_keywords,
+)
+from services.match_engine import normalize_skill
+from services.taxonomy import get_taxonomy
+from utils.tokenizer import STOPWORDS, TokenizedDocument
+
+RESUME_TEXT = """
+Jane Doe | Backend Engineer | jane.doe@example.com | https://github.com/janedoe | https://linkedin.com/in/janedoe
+SUMMARY
+Backend engineer with 4+ years building Python/FastAPI services, REST APIs and data pipelines on AWS.
+EXPERIENCE
+Software Engineer - Acme Corp (2021 - Present)
+- Built a FastAPI + PostgreSQL order service handling 1.2M requests/day; reduced p95 latency by 38%.
+- Implemented CI/CD with GitHub Actions, Docker and Kubernetes (EKS); cut release time from 2h to 15 min.
+- Led migration of cron jobs to Airflow ETL pipelines; improved data freshness by 4x.
+Junior Developer - Beta Labs (2019 - 2021)
+- Designed Node.js/Express microservices and React dashboards for 20+ internal users.
+- Automated reporting in Excel/Power BI, saving 10 hours per week.
+PROJECTS
+Resume Matcher: NLP skill extraction with scikit-learn, pandas and spaCy; 92% precision on labeled set.
+SKILLS
+Python, Java, C++, C#, SQL, NoSQL, MongoDB, Redis, AWS, GCP, Docker, Kubernetes, Terraform, Git, Linux.
+EDUCATION
+B.Tech Computer Science - State University (2019)
+""".strip()
+
+JD_TEXT = """
+We are hiring a Senior Backend Engineer with strong Python and SQL skills to join our platform team.
+Responsibilities: design and build scalable REST/GraphQL APIs with FastAPI or Django; own services on AWS
+(Lambda, ECS, S3, RDS); work with Docker, Kubernetes and Terraform; mentor junior engineers.
+Requirements: 4+ years of backend experience, Python 3.x, PostgreSQL/MySQL, Redis, Kafka, CI/CD, Git.
+Nice to have: Go, Node.js, React, machine learning, data pipelines (Airflow, Spark), observability (Prometheus, Grafana).
+""".strip()
+
+SKILLS = [
+    "Python", "Node.js", "C++", "C#", "Machine Learning", "REST APIs", "CI/CD", "Power BI", "scikit-learn",
+    "PostgreSQL", "AWS (Lambda, ECS)", "Data Pipelines", "  Spark  ", "Go", "GraphQL", "Terraform",
+]
+
+
+def legacy_tokenize(text: str):
+    tokens = re.findall(r"[a-zA-Z0-9\+\#\.]+", text.lower())
+    cleaned = []
+    for token in tokens:
+        normalized = token.strip(".,:;!?()[]{}\"'`")
+        normalized = normalized.strip("+-/#")
+        if normalized:
+            cleaned.append(normalized)
+    return [t for t in cleaned if len(t) > 2 and t not in STOPWORDS]
+
+
+def legacy_normalize_skill(skill: str):
+    cleaned = re.sub(r"[^a-z0-9\s]+", " ", (skill or "").lower())
+    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+    return cleaned
+
+
+def legacy_bullet_flags(bullet: str):
+    lowered = bullet.lower()
+    return (
+        bool(re.search(r"\b(built|implemented|designed|led|optimized|automated|delivered|improved)\b", lowered)),
+        bool(re.search(r"\b\d+(\.\d+)?%?\b", bullet)),
+        bool(re.search(r"\b(result|impact|reduced|increased|improved|achieved|delivered)\b", lowered)),
+    )
+
+
+def legacy_general_keywords(text: str, limit: int):
+    taxonomy = get_taxonomy()
+    freq = {}
+    for token in legacy_tokenize(text):
+        if token in RESUME_KEYWORD_STOPWORDS or token.isdigit():
+            continue
+        freq[token] = freq.get(token, 0) + 1
+    output = []
+    for token, _ in sorted(freq.items(), key=lambda kv: (-kv[1], kv[0])):
+        cleaned = taxonomy.alias("general_keywords", token, token.capitalize())
+        if cleaned.lower() in taxonomy.generic_non_skills:
+            continue
+        output.append(cleaned)
+        if len(output) >= limit:
+            break
+    return output
+
+
+def bullet_flags(bullet: str):
+    lowered = bullet.lower()
+    return (
+        bool(_BULLET_ACTION_RE.search(lowered)),
+        bool(_METRIC_RE.search(bullet)),
+        bool(_BULLET_IMPACT_RE.search(lowered)),
+    )
+
+
+def _random_text(rng: random.Random, length: int):
+    alphabet = string.ascii_letters + string.digits + " .+#-/,:;()\n\t" + "éİß–’"
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+def _scraped_page(rng: random.Random, words: int = 6000):
+    # Long scraped JD/resume pages: thousands of distinct tokens, few of them repeated.
+    vocabulary = [f"{rng.choice(string.ascii_lowercase)}{rng.randint(0, 99999)}x" for _ in range(4000)]
+    return " ".join(rng.choice(vocabulary) for _ in range(words)) + " " + JD_TEXT
+
+
+def check_equivalence(samples: int = 20000, seed: int = 7):
+    rng = random.Random(seed)
+    texts = [RESUME_TEXT, JD_TEXT] + SKILLS + [_random_text(rng, rng.randint(0, 60)) for _ in range(samples)]
+    for text in texts:
+        assert _tokenize(text) == legacy_tokenize(text), text
+        document = TokenizedDocument(text, STOPWORDS)
+        assert all(document.lowered[start:end] == token for token, (start, end) in zip(document.tokens, document.offsets))
+        # normalize_skill is lru_cached; bypass the cache so the implementation itself is compared.
+        assert normalize_skill.__wrapped__(text) == legacy_normalize_skill(text), text
+        scored = _score_single_bullet(text, [])
+        assert (scored["has_action"], scored["has_metric"], scored["has_impact"]) == legacy_bullet_flags(text), text
+        assert _extract_general_keywords(text, 12) == legacy_general_keywords(text, 12), text
+    return len(texts)
+
+
+def _per_call_us(fn, number: int, repeat: int):
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    checked = check_equivalence()
+    print(f"equivalence: {checked} inputs identical")
+
+    # Clearing re's internal cache each call shows the cost the legacy code pays once the
+    # cache is churned by other patterns; the warm number is its best case.
+    def legacy_tokenize_cold():
+        re.purge()
+        legacy_tokenize(JD_TEXT)
+
+    bullets = [line for line in RESUME_TEXT.splitlines() if line.startswith("- ")]
+    scraped_counts = TokenizedDocument(_scraped_page(random.Random(11)), STOPWORDS).counts
+
+    def legacy_top_keywords():
+        freq = {t: c for t, c in scraped_counts.items() if t not in RESUME_KEYWORD_STOPWORDS and not t.isdigit()}
+        return sorted(freq.items(), key=lambda kv: (-kv[1], kv[0]))[:18]
+
+    normalize = normalize_skill.__wrapped__
+    cases = [
+        # TokenizedDocument directly: _tokenize itself is memoized per document and would time a cache hit.
+        ("tokenize(resume)", lambda: legacy_tokenize(RESUME_TEXT), lambda: TokenizedDocument(RESUME_TEXT, STOPWORDS), 2000),
+        ("tokenize(jd)", lambda: legacy_tokenize(JD_TEXT), lambda: TokenizedDocument(JD_TEXT, STOPWORDS), 2000),
+        ("tokenize(jd), re cache purged", legacy_tokenize_cold, lambda: TokenizedDocument(JD_TEXT, STOPWORDS), 500),
+        (
+            "normalize_skill x16 (uncached)",
+            lambda: [legacy_normalize_skill(s) for s in SKILLS],
+            lambda: [normalize(s) for s in SKILLS],
+            5000,
+        ),
+        (
+            "top-18 keywords, scraped page",
+            legacy_top_keywords,
+            lambda: _top_general_keywords(scraped_counts, 18),
+            200,
+        ),
+        (
+            "bullet flags x5",
+            lambda: [legacy_bullet_flags(b) for b in bullets],
+            lambda: [bullet_flags(b) for b in bullets],
+            5000,
+        ),
+    ]
+    print(f"{'case':34} {'legacy us':>10} {'current us':>11} {'speedup':>8}")
+    for name, legacy, current, number in cases:
+        before = _per_call_us(legacy, number, args.repeat)
+        after = _per_call_us(current, number, args.repeat)
+        print(f"{name:34} {before:10.2f} {after:11.2f} {before / after:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
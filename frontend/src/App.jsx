@@ -597,20 +597,18 @@ function App() {
           return;
         }
 
-        const combinedAnswer = selectedQuestion
-          ? `Question: ${selectedQuestion}\nAnswer: ${interviewAnswer}`
-          : interviewAnswer;
-
-        const evalRes = await axios.post(`${API_BASE}/evaluate-answer`, null, {
-          params: { answer: combinedAnswer },
+        // JSON body instead of a query string: long answers exceed URL length limits.
+        const evalRes = await axios.post(`${API_BASE}/evaluate-session`, {
+          answers: [{ question: selectedQuestion || "", answer: interviewAnswer }],
         });
+        const evaluation = evalRes.data?.results?.[0];
 
-        setInterviewEval(evalRes.data);
+        setInterviewEval(evaluation);
         addHistory({
           mode,
           job,
           title: currentMode.title,
-          summary: `Interview score: ${evalRes.data?.score ?? "-"}`,
+          summary: `Interview score: ${evaluation?.score ?? "-"}`,
         });
         return;
       }
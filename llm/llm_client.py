@@ -1,20 +1,16 @@
+from services.taxonomy import get_taxonomy
+
+
 class LLMClient:
     """
     Mock LLM client.
     Prepared for Nova integration later.
+    Skill categories (technical / soft / domain) come from the shared taxonomy.
     """
 
-    TECH_SKILLS = ["Python", "Java", "React", "SQL", "FastAPI", "AWS", "Docker"]
-    SOFT_SKILLS = ["Leadership", "Communication", "Teamwork"]
-    DOMAIN_SKILLS = ["Digital Marketing", "SEO"]
-
     async def extract_resume_data(self, resume_text: str):
 
-        skills = []
-
-        for skill in self.TECH_SKILLS + self.SOFT_SKILLS + self.DOMAIN_SKILLS:
-            if skill.lower() in resume_text.lower():
-                skills.append(skill)
+        skills = get_taxonomy().categorized_skill_matcher.find(resume_text)
 
         categorized = self.categorize_skills(skills)
 
@@ -26,11 +22,7 @@ class LLMClient:
 
     async def extract_job_data(self, job_text: str):
 
-        skills = []
-
-        for skill in self.TECH_SKILLS + self.SOFT_SKILLS + self.DOMAIN_SKILLS:
-            if skill.lower() in job_text.lower():
-                skills.append(skill)
+        skills = get_taxonomy().categorized_skill_matcher.find(job_text)
 
         categorized = self.categorize_skills(skills)
 
@@ -41,11 +33,13 @@ class LLMClient:
         }
 
     def categorize_skills(self, skills):
-        return {
-            "technical": [s for s in skills if s in self.TECH_SKILLS],
-            "soft": [s for s in skills if s in self.SOFT_SKILLS],
-            "domain": [s for s in skills if s in self.DOMAIN_SKILLS]
-        }
+        skill_category = get_taxonomy().skill_category
+        categorized = {"technical": [], "soft": [], "domain": []}
+        for s in skills:
+            category = skill_category.get(s.lower())
+            if category in categorized:
+                categorized[category].append(s)
+        return categorized
 
     async def generate_match_explanation(self, score):
 
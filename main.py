@@ -1,44 +1,148 @@
-from fastapi import FastAPI, UploadFile, File, Query
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from fastapi import FastAPI, UploadFile, File, Form, Query, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from datetime import datetime, timedelta, timezone
+import asyncio
+import json
 import random
 import re
 import os
-import smtplib
-import sqlite3
 import tempfile
+import threading
 from email.message import EmailMessage
 
 from services.ai_service import (
     analyze_resume,
     analyze_job,
-    calculate_match,
-    detect_skill_gap,
+    job_analysis_cache_stats,
+    prewarm_job_analysis,
+    match_resume_to_job,
     generate_improvement_suggestions,
     generate_explanation,
     generate_career_roadmap,
     generate_interview_questions,
     evaluate_answer,
-    get_matched_skills,
+    evaluate_session,
     generate_resume_reference,
     format_resume_reference,
     build_resume_intelligence,
+    INTELLIGENCE_SECTIONS,
     extract_profile_links,
 )
 
-from utils.parser import extract_text_from_pdf
+from services.history_store import HistoryQueueFull, HistoryStore
+from services.job_corpus import JobCorpus
+from services.otp_store import OTP_EXPIRED, OTP_INVALID, OTP_LOCKED, OTP_MISSING, create_otp_store
+from services.relevance import MATCH_MODES
+from services.resume_cache import ResumeCache
+from services.taxonomy import get_taxonomy, get_taxonomy_store
+from utils.client_ip import client_ip
+from utils.mailer import MailQueueFull, SMTPMailer
+from utils.pdf_pool import PdfExtractionPool, PdfPoolSaturated, PdfExtractionTimeout
+from utils.uploads import SpooledUpload, spool_upload
 
-app = FastAPI()
-OTP_STORE = {}
 OTP_TTL_MINUTES = 10
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+OTP_STORE_BACKEND = os.getenv("OTP_STORE_BACKEND", "memory").strip().lower()
+OTP_STORE_MAX_ENTRIES = int(os.getenv("OTP_STORE_MAX_ENTRIES", "10000"))
+OTP_RATE_WINDOW_SECONDS = float(os.getenv("OTP_RATE_WINDOW_SECONDS", "900"))
+OTP_RATE_LIMIT_PER_EMAIL = int(os.getenv("OTP_RATE_LIMIT_PER_EMAIL", "5"))
+OTP_RATE_LIMIT_PER_IP = int(os.getenv("OTP_RATE_LIMIT_PER_IP", "20"))
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+OTP_VERIFY_LIMIT_PER_EMAIL = int(os.getenv("OTP_VERIFY_LIMIT_PER_EMAIL", "10"))
+OTP_VERIFY_LIMIT_PER_IP = int(os.getenv("OTP_VERIFY_LIMIT_PER_IP", "50"))
+OTP_MAX_VERIFY_ATTEMPTS = int(os.getenv("OTP_MAX_VERIFY_ATTEMPTS", "5"))
 DB_FILENAME = "internpilot_history.db"
 SMTP_HOST = os.getenv("SMTP_HOST", "").strip()
 SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
 SMTP_USER = os.getenv("SMTP_USER", "").strip()
 SMTP_PASS = os.getenv("SMTP_PASS", "").strip()
 SMTP_FROM = os.getenv("SMTP_FROM", SMTP_USER).strip()
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").strip().lower() not in {"0", "false", "no"}
+MAIL_QUEUE_MAX = int(os.getenv("MAIL_QUEUE_MAX", "100"))
+MAIL_MAX_RETRIES = int(os.getenv("MAIL_MAX_RETRIES", "3"))
 CORS_ORIGINS_ENV = os.getenv("CORS_ORIGINS", "").strip()
+PDF_POOL_WORKERS = int(os.getenv("PDF_POOL_WORKERS", "2"))
+PDF_POOL_MAX_PENDING = int(os.getenv("PDF_POOL_MAX_PENDING", "8"))
+PDF_EXTRACT_TIMEOUT_SECONDS = float(os.getenv("PDF_EXTRACT_TIMEOUT_SECONDS", "20"))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "10"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "100000"))
+UPLOAD_SPOOL_THRESHOLD_BYTES = int(os.getenv("UPLOAD_SPOOL_THRESHOLD_BYTES", str(1024 * 1024)))
+BATCH_MATCH_MAX_JOBS = int(os.getenv("BATCH_MATCH_MAX_JOBS", "50"))
+BATCH_MATCH_WORKERS = int(os.getenv("BATCH_MATCH_WORKERS", "4"))
+INTELLIGENCE_STAGE_WORKERS = int(os.getenv("INTELLIGENCE_STAGE_WORKERS", "0"))
+EVALUATE_SESSION_MAX_ANSWERS = int(os.getenv("EVALUATE_SESSION_MAX_ANSWERS", "50"))
+RESUME_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "256"))
+RESUME_CACHE_TTL_SECONDS = float(os.getenv("RESUME_CACHE_TTL_SECONDS", "86400"))
+RESUME_CACHE_MAX_BYTES = int(os.getenv("RESUME_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESUME_CACHE_DB_PATH = os.getenv("RESUME_CACHE_DB_PATH", "").strip()
+RESUME_CACHE_DB_MAX_ENTRIES = int(os.getenv("RESUME_CACHE_DB_MAX_ENTRIES", "10000"))
+RESUME_CACHE_DB_MAX_BYTES = int(os.getenv("RESUME_CACHE_DB_MAX_BYTES", str(256 * 1024 * 1024)))
+JOB_ANALYSIS_PREWARM_PATH = os.getenv("JOB_ANALYSIS_PREWARM_PATH", "").strip()
+JOB_ANALYSIS_PREWARM_CORPUS = int(os.getenv("JOB_ANALYSIS_PREWARM_CORPUS", "0"))
+HISTORY_DB_POOL_SIZE = int(os.getenv("HISTORY_DB_POOL_SIZE", "4"))
+HISTORY_PAGE_MAX = int(os.getenv("HISTORY_PAGE_MAX", "200"))
+HISTORY_WRITE_INTERVAL_MS = float(os.getenv("HISTORY_WRITE_INTERVAL_MS", "10"))
+HISTORY_WRITE_BATCH_SIZE = int(os.getenv("HISTORY_WRITE_BATCH_SIZE", "256"))
+HISTORY_WRITE_QUEUE_MAX = int(os.getenv("HISTORY_WRITE_QUEUE_MAX", "1000"))
+HISTORY_FTS_BACKFILL_CHUNK = int(os.getenv("HISTORY_FTS_BACKFILL_CHUNK", "500"))
+
+PDF_POOL = PdfExtractionPool(
+    max_workers=PDF_POOL_WORKERS,
+    max_pending=PDF_POOL_MAX_PENDING,
+    timeout_seconds=PDF_EXTRACT_TIMEOUT_SECONDS,
+)
+# One thread per /batch-match call in flight; a batch's jobs are scored one after another on it.
+BATCH_MATCH_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, BATCH_MATCH_WORKERS), thread_name_prefix="batch-match")
+# Resume-intelligence stages run inline unless workers are configured.
+INTELLIGENCE_EXECUTOR = (
+    ThreadPoolExecutor(max_workers=INTELLIGENCE_STAGE_WORKERS, thread_name_prefix="intelligence-stage")
+    if INTELLIGENCE_STAGE_WORKERS > 0
+    else None
+)
+RESUME_CACHE = ResumeCache(
+    max_entries=RESUME_CACHE_MAX_ENTRIES,
+    ttl_seconds=RESUME_CACHE_TTL_SECONDS,
+    max_bytes=RESUME_CACHE_MAX_BYTES,
+    db_path=RESUME_CACHE_DB_PATH,
+    db_max_entries=RESUME_CACHE_DB_MAX_ENTRIES,
+    db_max_bytes=RESUME_CACHE_DB_MAX_BYTES,
+)
+
+
+def _load_prewarm_texts(path: str):
+    """Job descriptions from a JSON file holding a list of strings or of {"text": ...} objects."""
+    with open(path, "r", encoding="utf-8") as prewarm_file:
+        entries = json.load(prewarm_file)
+    return [entry.get("text", "") if isinstance(entry, dict) else str(entry) for entry in entries]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    texts = _load_prewarm_texts(JOB_ANALYSIS_PREWARM_PATH) if JOB_ANALYSIS_PREWARM_PATH else []
+    if JOB_ANALYSIS_PREWARM_CORPUS > 0:
+        texts += await JOB_CORPUS.recent_texts(JOB_ANALYSIS_PREWARM_CORPUS)
+    if texts:
+        await prewarm_job_analysis(texts)
+    yield
+    PDF_POOL.shutdown()
+    BATCH_MATCH_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    if INTELLIGENCE_EXECUTOR is not None:
+        INTELLIGENCE_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    RESUME_CACHE.close()
+    JOB_CORPUS.close()
+    HISTORY_STORE.close()
+    OTP_EXECUTOR.shutdown(wait=True)
+    OTP_STORE.close()
+    if MAILER is not None:
+        MAILER.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 def _resolve_db_path():
@@ -56,6 +160,22 @@ def _resolve_db_path():
 
 
 DB_PATH = _resolve_db_path()
+HISTORY_STORE = HistoryStore(
+    DB_PATH,
+    pool_size=HISTORY_DB_POOL_SIZE,
+    write_interval_seconds=HISTORY_WRITE_INTERVAL_MS / 1000,
+    write_batch_size=HISTORY_WRITE_BATCH_SIZE,
+    write_queue_max=HISTORY_WRITE_QUEUE_MAX,
+    fts_backfill_chunk=HISTORY_FTS_BACKFILL_CHUNK,
+)
+JOB_CORPUS_DB_PATH = os.getenv("JOB_CORPUS_DB_PATH", "").strip() or os.path.join(
+    os.path.dirname(DB_PATH), "internpilot_jobs.db"
+)
+JOB_CORPUS = JobCorpus(JOB_CORPUS_DB_PATH)
+OTP_DB_PATH = os.getenv("OTP_DB_PATH", "").strip() or os.path.join(os.path.dirname(DB_PATH), "internpilot_otp.db")
+OTP_STORE = create_otp_store(OTP_STORE_BACKEND, db_path=OTP_DB_PATH, max_entries=OTP_STORE_MAX_ENTRIES)
+# The SQLite backend can wait out another worker's write lock (5 s busy timeout), so store calls run here.
+OTP_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="otp-store")
 
 
 def _allowed_origins():
@@ -94,7 +214,7 @@ def _missing_smtp_fields():
     return missing
 
 
-def _send_otp_email(recipient_email: str, otp_code: str):
+def _build_otp_email(recipient_email: str, otp_code: str):
     msg = EmailMessage()
     msg["Subject"] = "Your InternPilot OTP Code"
     msg["From"] = SMTP_FROM
@@ -104,51 +224,60 @@ def _send_otp_email(recipient_email: str, otp_code: str):
         f"This code expires in {OTP_TTL_MINUTES} minutes.\n"
         "If you did not request this, you can ignore this email."
     )
+    return msg
 
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=15) as server:
-        server.starttls()
-        server.login(SMTP_USER, SMTP_PASS)
-        server.send_message(msg)
 
+MAILER = SMTPMailer(
+    SMTP_HOST,
+    SMTP_PORT,
+    user=SMTP_USER,
+    password=SMTP_PASS,
+    use_starttls=SMTP_STARTTLS,
+    max_queue=MAIL_QUEUE_MAX,
+    max_retries=MAIL_MAX_RETRIES,
+) if _smtp_configured() else None
 
-def _db_connect():
-    db_dir = os.path.dirname(DB_PATH)
-    if db_dir:
-        os.makedirs(db_dir, exist_ok=True)
 
-    try:
-        conn = sqlite3.connect(DB_PATH)
-    except sqlite3.OperationalError:
-        # Last-resort fallback so history feature keeps working even if path is not writable.
-        fallback_path = os.path.join(tempfile.gettempdir(), DB_FILENAME)
-        conn = sqlite3.connect(fallback_path)
+def _resume_text_key(digest: str):
+    # The extraction limits shape the text, so the text and everything derived from it are keyed by them too.
+    return f"{digest}:{PDF_MAX_PAGES}:{PDF_MAX_CHARS}"
 
-    conn.row_factory = sqlite3.Row
-    return conn
 
+async def _extract_resume_text(upload: SpooledUpload):
+    text_key = _resume_text_key(upload.digest)
+    cached = RESUME_CACHE.get("text", text_key)
+    if cached is not None:
+        return cached
 
-def _init_db():
-    conn = _db_connect()
     try:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS search_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                client_id TEXT NOT NULL,
-                mode TEXT NOT NULL,
-                title TEXT NOT NULL,
-                summary TEXT NOT NULL,
-                job TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.commit()
-    finally:
-        conn.close()
+        resume_text = await PDF_POOL.extract_text(upload.source, PDF_MAX_PAGES, PDF_MAX_CHARS)
+    except PdfPoolSaturated as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "5"})
+    except PdfExtractionTimeout as exc:
+        raise HTTPException(status_code=422, detail=f"{exc} Upload a shorter, text-based PDF.")
+
+    RESUME_CACHE.set("text", text_key, resume_text or "")
+    return resume_text or ""
+
+
+async def _analyze_resume_cached(resume_text: str, text_key: str):
+    # Skill analysis depends on the taxonomy, so a taxonomy reload must not serve stale results.
+    cache_key = f"{text_key}:{get_taxonomy().revision}"
+    cached = RESUME_CACHE.get("analysis", cache_key)
+    if cached is not None:
+        return cached
+    resume_data = await analyze_resume(resume_text)
+    RESUME_CACHE.set("analysis", cache_key, resume_data)
+    return resume_data
 
 
-_init_db()
+def _profile_links_cached(resume_text: str, text_key: str):
+    cached = RESUME_CACHE.get("links", text_key)
+    if cached is not None:
+        return cached
+    links = extract_profile_links(resume_text)
+    RESUME_CACHE.set("links", text_key, links)
+    return links
 
 
 class HistoryItemIn(BaseModel):
@@ -157,83 +286,258 @@ class HistoryItemIn(BaseModel):
     summary: str
     job: str
 
+
+class JobPostingIn(BaseModel):
+    text: str
+    title: str = ""
+
+
+class JobPostingBatchIn(BaseModel):
+    postings: List[JobPostingIn]
+
+
+class InterviewAnswerIn(BaseModel):
+    question: str = ""
+    answer: str
+
+
+class InterviewSessionIn(BaseModel):
+    answers: List[InterviewAnswerIn]
+
+
+class JobAnalysisPrewarmIn(BaseModel):
+    texts: List[str] = []
+    corpus_limit: int = 0
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=_allowed_origins(),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 @app.get("/")
 async def home():
     return {"message": "InternPilot FINAL API 🚀"}
 
-@app.post("/upload-and-analyze")
-async def upload_and_analyze(
-    file: UploadFile = File(...),
-    job: str = Query(...)
-):
-    file_bytes = await file.read()
-    resume_text = extract_text_from_pdf(file_bytes)
-    if not resume_text or not resume_text.strip():
-        return {
-            "match_score": 0,
-            "match_explanation": "Could not extract text from the uploaded resume PDF. If this is a scanned/image PDF, upload a text-based PDF.",
-            "confidence": 0,
-            "matched_skills": [],
-            "missing_skills": [],
-            "improvement_suggestions": ["Upload a selectable-text PDF resume for accurate analysis."],
-            "career_roadmap": ["Re-upload resume in text-based PDF format and try again."],
-            "hireability_status": "NEEDS IMPROVEMENT",
-            "recruiter_decision": "Resume parsing failed",
-            "interview_questions": ["Tell me about yourself."],
-        }
-
-    resume_data = await analyze_resume(resume_text)
-    job_data = await analyze_job(job)
-    role_title = job_data.get("role_title", "Target Role")
-    role_family = job_data.get("role_family", "general")
+async def _read_resume_upload(file: UploadFile):
+    upload = await spool_upload(file, UPLOAD_SPOOL_THRESHOLD_BYTES)
+    try:
+        resume_text = await _extract_resume_text(upload)
+    finally:
+        upload.cleanup()
+    return resume_text, _resume_text_key(upload.digest)
 
-    match_score = calculate_match(resume_data, job_data)
-    explanation_data = await generate_explanation(match_score)
 
-    missing_skills = detect_skill_gap(resume_data, job_data)
-    suggestions = generate_improvement_suggestions(missing_skills, role_title=role_title)
-    roadmap = generate_career_roadmap(missing_skills, role_title=role_title)
+def _hireability(match_score: int):
+    if match_score >= 85:
+        return "🔥 TOP CANDIDATE", "Highly Recommended for Interview"
+    if match_score >= 65:
+        return "⭐ STRONG POTENTIAL", "Consider After Skill Improvement"
+    return "⚠️ NEEDS IMPROVEMENT", "Needs Training Before Hiring"
 
-    matched_skills = get_matched_skills(resume_data, job_data)
 
-    # ⭐ Interview Questions Generated
-    question_seed = matched_skills if matched_skills else job_data.get("required_skills", [])
-    questions = generate_interview_questions(question_seed, role_title=role_title, role_family=role_family)
+async def _match_summary(resume_data: dict, job_text: str, match_mode: str = "skills", resume_text: str = ""):
+    """Score and skill overlap for one resume/JD pair; returns (job_data, summary)."""
+    job_data = await analyze_job(job_text)
+    role_title = job_data.get("role_title", "Target Role")
+    role_family = job_data.get("role_family", "general")
 
-    if match_score >= 85:
-        hireability = "🔥 TOP CANDIDATE"
-        recruiter_decision = "Highly Recommended for Interview"
-    elif match_score >= 65:
-        hireability = "⭐ STRONG POTENTIAL"
-        recruiter_decision = "Consider After Skill Improvement"
-    else:
-        hireability = "⚠️ NEEDS IMPROVEMENT"
-        recruiter_decision = "Needs Training Before Hiring"
+    matched_skills, missing_skills, match_score = match_resume_to_job(resume_data, job_data)
+    if match_mode != "skills":
+        # Text relevance replaces the skill ratio as the score; matched/missing stay skill-based.
+        match_score = JOB_CORPUS.relevance.pair_score(resume_text, job_text, mode=match_mode)
+    explanation_data = await generate_explanation(match_score)
+    hireability, recruiter_decision = _hireability(match_score)
 
-    return {
+    return job_data, {
         "role_title": role_title,
         "role_family": role_family,
+        "match_mode": match_mode,
         "match_score": match_score,
         "match_explanation": explanation_data["match_explanation"],
         "confidence": explanation_data["confidence"],
         "matched_skills": matched_skills,
         "missing_skills": missing_skills,
-        "improvement_suggestions": suggestions,
-        "career_roadmap": roadmap,
         "hireability_status": hireability,
         "recruiter_decision": recruiter_decision,
-        "interview_questions": questions
     }
 
 
+UNREADABLE_RESUME_REPORT = {
+    "match_score": 0,
+    "match_explanation": "Could not extract text from the uploaded resume PDF. If this is a scanned/image PDF, upload a text-based PDF.",
+    "confidence": 0,
+    "matched_skills": [],
+    "missing_skills": [],
+    "improvement_suggestions": ["Upload a selectable-text PDF resume for accurate analysis."],
+    "career_roadmap": ["Re-upload resume in text-based PDF format and try again."],
+    "hireability_status": "NEEDS IMPROVEMENT",
+    "recruiter_decision": "Resume parsing failed",
+    "interview_questions": ["Tell me about yourself."],
+}
+
+# Streamed event name -> report key, in the order they follow the "match" event.
+_STREAMED_AFTER_MATCH = {
+    "suggestions": "improvement_suggestions",
+    "roadmap": "career_roadmap",
+    "interview_questions": "interview_questions",
+}
+
+
+def _interview_questions_for(job_data: dict, summary: dict):
+    # ⭐ Interview Questions Generated
+    question_seed = summary["matched_skills"] if summary["matched_skills"] else job_data.get("required_skills", [])
+    return generate_interview_questions(question_seed, role_title=summary["role_title"], role_family=summary["role_family"])
+
+
+async def _build_match_report(resume_data: dict, job_text: str, match_mode: str = "skills", resume_text: str = ""):
+    job_data, summary = await _match_summary(resume_data, job_text, match_mode=match_mode, resume_text=resume_text)
+    role_title = summary["role_title"]
+    return {
+        **summary,
+        "improvement_suggestions": generate_improvement_suggestions(summary["missing_skills"], role_title=role_title),
+        "career_roadmap": generate_career_roadmap(summary["missing_skills"], role_title=role_title),
+        "interview_questions": _interview_questions_for(job_data, summary),
+    }
+
+
+def _batch_match_reports(resume_data: dict, job_texts, emit, cancelled):
+    """Score a batch's JDs in order on the calling worker thread, passing each row to `emit`, then None."""
+
+    async def score_all():
+        for index, job_text in enumerate(job_texts):
+            if cancelled.is_set():
+                return
+            try:
+                report = await _build_match_report(resume_data, job_text)
+                emit({"type": "result", "index": index, **report})
+            except Exception as exc:
+                emit({"type": "error", "index": index, "message": str(exc) or type(exc).__name__})
+
+    try:
+        # The analysis coroutines never await I/O, so one private event loop drives the whole batch.
+        asyncio.run(score_all())
+    finally:
+        emit(None)
+
+
+@app.post("/upload-and-analyze")
+async def upload_and_analyze(
+    file: UploadFile = File(...),
+    job: str = Query(...),
+    match_mode: str = Query("skills"),
+):
+    if match_mode not in MATCH_MODES:
+        raise HTTPException(status_code=422, detail=f"match_mode must be one of: {', '.join(MATCH_MODES)}.")
+    resume_text, text_key = await _read_resume_upload(file)
+    if not resume_text or not resume_text.strip():
+        return dict(UNREADABLE_RESUME_REPORT)
+
+    resume_data = await _analyze_resume_cached(resume_text, text_key)
+    return await _build_match_report(resume_data, job, match_mode=match_mode, resume_text=resume_text)
+
+
+def _stream_event(event: str, payload: dict, sse: bool):
+    body = json.dumps({"type": event, **payload})
+    return f"event: {event}\ndata: {body}\n\n" if sse else body + "\n"
+
+
+@app.post("/upload-and-analyze/stream")
+async def upload_and_analyze_stream(
+    request: Request,
+    file: UploadFile = File(...),
+    job: str = Query(...),
+    match_mode: str = Query("skills"),
+):
+    """
+    Same analysis as /upload-and-analyze, streamed section by section.
+
+    The "match" event (score, matched/missing skills, verdict) is sent as soon as
+    extraction and matching finish; "suggestions", "roadmap" and
+    "interview_questions" follow. NDJSON by default, server-sent events when the
+    client sends `Accept: text/event-stream`.
+    """
+    if match_mode not in MATCH_MODES:
+        raise HTTPException(status_code=422, detail=f"match_mode must be one of: {', '.join(MATCH_MODES)}.")
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    resume_text, text_key = await _read_resume_upload(file)
+    readable = bool(resume_text and resume_text.strip())
+    resume_data = await _analyze_resume_cached(resume_text, text_key) if readable else None
+
+    async def stream():
+        if not readable:
+            report = UNREADABLE_RESUME_REPORT
+            summary = {key: value for key, value in report.items() if key not in _STREAMED_AFTER_MATCH.values()}
+            yield _stream_event("match", summary, sse)
+            for event, key in _STREAMED_AFTER_MATCH.items():
+                yield _stream_event(event, {key: report[key]}, sse)
+            return
+
+        job_data, summary = await _match_summary(resume_data, job, match_mode=match_mode, resume_text=resume_text)
+        yield _stream_event("match", summary, sse)
+        role_title = summary["role_title"]
+        suggestions = generate_improvement_suggestions(summary["missing_skills"], role_title=role_title)
+        yield _stream_event("suggestions", {"improvement_suggestions": suggestions}, sse)
+        roadmap = generate_career_roadmap(summary["missing_skills"], role_title=role_title)
+        yield _stream_event("roadmap", {"career_roadmap": roadmap}, sse)
+        questions = _interview_questions_for(job_data, summary)
+        yield _stream_event("interview_questions", {"interview_questions": questions}, sse)
+
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    return StreamingResponse(stream(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+@app.post("/batch-match")
+async def batch_match(
+    file: UploadFile = File(...),
+    jobs: List[str] = Form(...),
+):
+    job_texts = [j for j in jobs if j and j.strip()]
+    if not job_texts:
+        raise HTTPException(status_code=422, detail="Provide at least one job description.")
+    if len(job_texts) > BATCH_MATCH_MAX_JOBS:
+        raise HTTPException(status_code=422, detail=f"At most {BATCH_MATCH_MAX_JOBS} job descriptions per batch.")
+
+    # Resume extraction and analysis happen once for the whole batch.
+    resume_text, text_key = await _read_resume_upload(file)
+    if not resume_text or not resume_text.strip():
+        raise HTTPException(
+            status_code=422,
+            detail="Could not extract text from the uploaded resume PDF. If this is a scanned/image PDF, upload a text-based PDF.",
+        )
+    resume_data = await _analyze_resume_cached(resume_text, text_key)
+
+    async def stream():
+        yield json.dumps({"type": "resume", "skills": resume_data.get("skills", []), "jobs": len(job_texts)}) + "\n"
+        ranking = []
+        loop = asyncio.get_running_loop()
+        rows = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def emit(row):
+            loop.call_soon_threadsafe(rows.put_nowait, row)
+
+        worker = loop.run_in_executor(BATCH_MATCH_EXECUTOR, _batch_match_reports, resume_data, job_texts, emit, cancelled)
+        try:
+            while (row := await rows.get()) is not None:
+                if row["type"] == "result":
+                    ranking.append({"index": row["index"], "role_title": row["role_title"], "match_score": row["match_score"]})
+                yield json.dumps(row) + "\n"
+            await worker
+        finally:
+            # Stops the worker after its current job if the client went away.
+            cancelled.set()
+        ranking.sort(key=lambda r: (-r["match_score"], r["index"]))
+        for rank, row in enumerate(ranking, start=1):
+            row["rank"] = rank
+        yield json.dumps({"type": "ranking", "ranking": ranking}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 # ⭐ NEW — Interview Evaluation API
 @app.post("/evaluate-answer")
 async def evaluate(answer: str = Query(...)):
@@ -241,28 +545,64 @@ async def evaluate(answer: str = Query(...)):
     return feedback
 
 
+@app.post("/evaluate-session")
+async def evaluate_interview_session(payload: InterviewSessionIn):
+    if not payload.answers:
+        raise HTTPException(status_code=422, detail="Provide at least one answer.")
+    if len(payload.answers) > EVALUATE_SESSION_MAX_ANSWERS:
+        raise HTTPException(status_code=422, detail=f"At most {EVALUATE_SESSION_MAX_ANSWERS} answers per session.")
+    return evaluate_session([(item.question, item.answer) for item in payload.answers])
+
+
+def _issue_otp_blocking(client_address: str, email: str, code: str):
+    """Rate-limit checks and code issue in one executor call; returns retry-after seconds (0 when issued)."""
+    retry_after = OTP_STORE.hit(f"ip:{client_address}", OTP_RATE_LIMIT_PER_IP, OTP_RATE_WINDOW_SECONDS)
+    if not retry_after:
+        retry_after = OTP_STORE.hit(f"email:{email}", OTP_RATE_LIMIT_PER_EMAIL, OTP_RATE_WINDOW_SECONDS)
+    if not retry_after:
+        OTP_STORE.issue(email, code, OTP_TTL_MINUTES * 60)
+    return retry_after
+
+
+def _verify_otp_blocking(client_address: str, email: str, code: str):
+    """Rate-limit checks and verification in one executor call: (retry-after seconds, verify status or None)."""
+    retry_after = OTP_STORE.hit(f"verify-ip:{client_address}", OTP_VERIFY_LIMIT_PER_IP, OTP_RATE_WINDOW_SECONDS)
+    if not retry_after:
+        retry_after = OTP_STORE.hit(f"verify:{email}", OTP_VERIFY_LIMIT_PER_EMAIL, OTP_RATE_WINDOW_SECONDS)
+    if retry_after:
+        return retry_after, None
+    return 0, OTP_STORE.verify(email, code, max_attempts=OTP_MAX_VERIFY_ATTEMPTS)
+
+
 @app.post("/auth/request-otp")
-async def request_otp(email: str = Query(...)):
+async def request_otp(request: Request, email: str = Query(...)):
     cleaned_email = (email or "").strip().lower()
-    if not re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", cleaned_email):
+    if not EMAIL_RE.match(cleaned_email):
         return {"ok": False, "message": "Please provide a valid email address."}
 
+    client_address = client_ip(request, TRUSTED_PROXY_HOPS)
     code = f"{random.randint(0, 999999):06d}"
-    expires_at = datetime.now(timezone.utc) + timedelta(minutes=OTP_TTL_MINUTES)
-    OTP_STORE[cleaned_email] = {"code": code, "expires_at": expires_at}
+    loop = asyncio.get_running_loop()
+    retry_after = await loop.run_in_executor(OTP_EXECUTOR, _issue_otp_blocking, client_address, cleaned_email, code)
+    if retry_after:
+        return {
+            "ok": False,
+            "message": f"Too many OTP requests. Try again in {retry_after} seconds.",
+            "retry_after_seconds": retry_after,
+        }
 
-    if _smtp_configured():
+    if MAILER is not None:
         try:
-            _send_otp_email(cleaned_email, code)
+            MAILER.send(_build_otp_email(cleaned_email, code))
             return {
                 "ok": True,
                 "message": f"OTP sent to {cleaned_email}. It expires in {OTP_TTL_MINUTES} minutes.",
                 "expires_in_minutes": OTP_TTL_MINUTES,
             }
-        except Exception:
+        except MailQueueFull:
             return {
                 "ok": False,
-                "message": "Failed to send OTP email. Check SMTP settings and try again.",
+                "message": "Email service is busy. Please try again in a moment.",
             }
 
     # Fallback development mode when SMTP is not configured.
@@ -275,22 +615,33 @@ async def request_otp(email: str = Query(...)):
 
 
 @app.post("/auth/verify-otp")
-async def verify_otp(email: str = Query(...), code: str = Query(...)):
+async def verify_otp(request: Request, email: str = Query(...), code: str = Query(...)):
     cleaned_email = (email or "").strip().lower()
     cleaned_code = (code or "").strip()
 
-    entry = OTP_STORE.get(cleaned_email)
-    if not entry:
+    client_address = client_ip(request, TRUSTED_PROXY_HOPS)
+    loop = asyncio.get_running_loop()
+    retry_after, status = await loop.run_in_executor(
+        OTP_EXECUTOR, _verify_otp_blocking, client_address, cleaned_email, cleaned_code
+    )
+    if retry_after:
+        return {
+            "ok": False,
+            "message": f"Too many verification attempts. Try again in {retry_after} seconds.",
+            "retry_after_seconds": retry_after,
+        }
+    if status == OTP_MISSING:
         return {"ok": False, "message": "No OTP found for this email. Request a new code."}
 
-    if datetime.now(timezone.utc) > entry["expires_at"]:
-        OTP_STORE.pop(cleaned_email, None)
+    if status == OTP_EXPIRED:
         return {"ok": False, "message": "OTP expired. Please request a new code."}
 
-    if entry["code"] != cleaned_code:
+    if status == OTP_INVALID:
         return {"ok": False, "message": "Invalid OTP code."}
 
-    OTP_STORE.pop(cleaned_email, None)
+    if status == OTP_LOCKED:
+        return {"ok": False, "message": "Too many invalid codes. Please request a new code."}
+
     return {"ok": True, "message": "Login successful.", "user": {"email": cleaned_email, "name": cleaned_email.split("@")[0]}}
 
 
@@ -300,84 +651,148 @@ async def smtp_status():
     return {
         "configured": len(missing) == 0,
         "missing_fields": missing,
+        "delivery": MAILER.stats() if MAILER is not None else None,
     }
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    return {"job_analysis": job_analysis_cache_stats(), "resume": RESUME_CACHE.stats()}
+
+
+@app.post("/cache/prewarm")
+async def cache_prewarm(payload: JobAnalysisPrewarmIn):
+    texts = list(payload.texts)
+    if payload.corpus_limit > 0:
+        texts += await JOB_CORPUS.recent_texts(payload.corpus_limit)
+    added = await prewarm_job_analysis(texts)
+    return {"added": added, "job_analysis": job_analysis_cache_stats()}
+
+
+@app.get("/taxonomy")
+async def taxonomy_status():
+    store = get_taxonomy_store()
+    return {**store.current().summary(), "path": store.path, "last_error": store.last_error}
+
+
+@app.post("/taxonomy/reload")
+async def taxonomy_reload():
+    store = get_taxonomy_store()
+    taxonomy = store.reload()
+    return {"ok": not store.last_error, **taxonomy.summary(), "last_error": store.last_error}
+
+
 @app.get("/history")
-async def get_history(client_id: str = Query(...)):
-    conn = _db_connect()
+async def get_history(
+    response: Response,
+    client_id: str = Query(...),
+    limit: int = Query(50, ge=1, le=HISTORY_PAGE_MAX),
+    cursor: str = Query(""),
+):
     try:
-        rows = conn.execute(
-            """
-            SELECT id, mode, title, summary, job, created_at
-            FROM search_history
-            WHERE client_id = ?
-            ORDER BY datetime(created_at) DESC, id DESC
-            LIMIT 50
-            """,
-            (client_id,),
-        ).fetchall()
-    finally:
-        conn.close()
-    return [dict(row) for row in rows]
+        items, next_cursor = await HISTORY_STORE.page(client_id, limit=limit, cursor=cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+
+@app.get("/history/search")
+async def search_history(
+    client_id: str = Query(...),
+    q: str = Query(...),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    return {"query": q, **await HISTORY_STORE.search(client_id, q, limit=limit, offset=offset)}
 
 
 @app.post("/history/add")
-async def add_history(item: HistoryItemIn, client_id: str = Query(...)):
-    created_at = datetime.now(timezone.utc).isoformat()
-    conn = _db_connect()
+async def add_history(item: HistoryItemIn, client_id: str = Query(...), wait: bool = Query(True)):
     try:
-        cursor = conn.execute(
-            """
-            INSERT INTO search_history (client_id, mode, title, summary, job, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (client_id, item.mode, item.title, item.summary, item.job, created_at),
-        )
-        conn.commit()
-        row = conn.execute(
-            """
-            SELECT id, mode, title, summary, job, created_at
-            FROM search_history
-            WHERE id = ?
-            """,
-            (cursor.lastrowid,),
-        ).fetchone()
-    finally:
-        conn.close()
-    return dict(row) if row else {}
+        return await HISTORY_STORE.add(client_id, item.model_dump(), wait=wait)
+    except HistoryQueueFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
 
 
 @app.delete("/history/clear")
 async def clear_history(client_id: str = Query(...)):
-    conn = _db_connect()
-    try:
-        conn.execute("DELETE FROM search_history WHERE client_id = ?", (client_id,))
-        conn.commit()
-    finally:
-        conn.close()
+    await HISTORY_STORE.clear(client_id)
     return {"ok": True}
 
 
 @app.delete("/history/{item_id}")
 async def delete_history_item(item_id: int, client_id: str = Query(...)):
-    conn = _db_connect()
-    try:
-        conn.execute(
-            "DELETE FROM search_history WHERE id = ? AND client_id = ?",
-            (item_id, client_id),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    await HISTORY_STORE.delete(client_id, item_id)
     return {"ok": True}
 
 
+@app.post("/jobs")
+async def add_job_posting(posting: JobPostingIn):
+    if not posting.text.strip():
+        raise HTTPException(status_code=422, detail="Job posting text is required.")
+    return await JOB_CORPUS.add(posting.text, posting.title)
+
+
+@app.post("/jobs/bulk")
+async def add_job_postings(batch: JobPostingBatchIn):
+    postings = [p.model_dump() for p in batch.postings if p.text.strip()]
+    added = await JOB_CORPUS.add_many(postings)
+    return {"added": len(added), "ids": [p["id"] for p in added], "corpus_size": len(JOB_CORPUS)}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job_posting(job_id: int):
+    posting = await JOB_CORPUS.get(job_id)
+    if posting is None:
+        raise HTTPException(status_code=404, detail="Job posting not found.")
+    return posting
+
+
+@app.put("/jobs/{job_id}")
+async def update_job_posting(job_id: int, posting: JobPostingIn):
+    if not posting.text.strip():
+        raise HTTPException(status_code=422, detail="Job posting text is required.")
+    updated = await JOB_CORPUS.update(job_id, posting.text, posting.title)
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Job posting not found.")
+    return updated
+
+
+@app.delete("/jobs/{job_id}")
+async def delete_job_posting(job_id: int):
+    if not await JOB_CORPUS.delete(job_id):
+        raise HTTPException(status_code=404, detail="Job posting not found.")
+    return {"ok": True}
+
+
+@app.post("/jobs/top-matches")
+async def top_job_matches(
+    file: UploadFile = File(...),
+    k: int = Query(10, ge=1, le=100),
+    match_mode: str = Query("skills"),
+):
+    if match_mode not in MATCH_MODES:
+        raise HTTPException(status_code=422, detail=f"match_mode must be one of: {', '.join(MATCH_MODES)}.")
+    resume_text, text_key = await _read_resume_upload(file)
+    if not resume_text or not resume_text.strip():
+        raise HTTPException(
+            status_code=422,
+            detail="Could not extract text from the uploaded resume PDF. If this is a scanned/image PDF, upload a text-based PDF.",
+        )
+    if match_mode != "skills":
+        # Scoring may first rebuild the corpus matrices, so keep it off the event loop.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, JOB_CORPUS.top_matches_by_text, resume_text, k, match_mode)
+    resume_data = await _analyze_resume_cached(resume_text, text_key)
+    return JOB_CORPUS.top_matches(resume_data.get("skills", []), k=k)
+
+
 @app.post("/extract-resume-links")
 async def extract_resume_links(file: UploadFile = File(...)):
-    file_bytes = await file.read()
-    resume_text = extract_text_from_pdf(file_bytes)
-    links = extract_profile_links(resume_text)
+    resume_text, text_key = await _read_resume_upload(file)
+    links = _profile_links_cached(resume_text, text_key)
     return links
 
 
@@ -390,7 +805,11 @@ async def generate_resume(
     linkedin: str = Query(""),
     github: str = Query(""),
     portfolio_url: str = Query(""),
+    sections: str = Query(""),
 ):
+    requested = [name.strip() for name in sections.split(",") if name.strip()] or None
+    if requested and any(name not in INTELLIGENCE_SECTIONS for name in requested):
+        raise HTTPException(status_code=422, detail=f"sections must be drawn from: {', '.join(INTELLIGENCE_SECTIONS)}.")
     intelligence = await build_resume_intelligence(
         job_text=job,
         profile_text=profile,
@@ -399,5 +818,7 @@ async def generate_resume(
         linkedin=linkedin,
         github=github,
         portfolio=portfolio_url,
+        executor=INTELLIGENCE_EXECUTOR,
+        sections=requested,
     )
     return intelligence
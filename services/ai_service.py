@@ -1,35 +1,32 @@
+import hashlib
+import os
 import re
-
-COMMON_SKILLS = [
-    "Python","Java","React","SQL","FastAPI","AWS",
-    "Docker","Digital Marketing","SEO",
-    "Leadership","Communication","Teamwork",
-    "Corporate Law","Legal Research","Contract Drafting","Compliance",
-    "Litigation","Negotiation","Due Diligence","Arbitration",
-    "Accounting","Financial Analysis","Auditing","Taxation",
-    "Sales","Customer Service","Human Resources","Recruitment",
-    "Supply Chain","Operations","Project Management","Risk Management"
-]
-
-GENERIC_NON_SKILLS = {
-    "developer", "engineer", "analyst", "specialist", "associate", "manager",
-    "job", "role", "position", "hiring", "looking", "seeking", "candidate",
-    "web", "frontend", "backend"
-}
-
-ROLE_SKILL_TEMPLATES = {
-    "web developer": ["HTML", "CSS", "JavaScript", "React", "Git", "REST API"],
-    "python developer": ["Python", "Django", "Flask", "FastAPI", "SQL", "Git"],
-    "java developer": ["Java", "Spring Boot", "SQL", "REST API", "Git", "OOP"],
-    "frontend developer": ["HTML", "CSS", "JavaScript", "React", "TypeScript", "UI"],
-    "backend developer": ["Python", "Java", "Node.js", "SQL", "REST API", "Docker"],
-    "cybersecurity analyst": ["Network Security", "SIEM", "Incident Response", "Vulnerability Assessment", "IAM", "Risk Management"],
-    "cyber security analyst": ["Network Security", "SIEM", "Incident Response", "Vulnerability Assessment", "IAM", "Risk Management"],
-    "blockchain developer": ["Blockchain", "Solidity", "Smart Contracts", "Web3", "Ethereum", "Cryptography"],
-}
+import threading
+from itertools import islice
+
+from services.match_engine import match_skills, normalize_skill
+from services.skill_matcher import skill_tokens
+from services.taxonomy import get_taxonomy
+from utils.cache import LRUCache
+from utils.stage_graph import StageGraph
+from utils.tokenizer import STOPWORDS, TokenizedDocument, iter_top_terms, tokenize_document
+
+# Patterns used on hot paths, compiled once instead of per call.
+_HIRING_TITLE_RE = re.compile(
+    r"(?:hiring|looking\s+for|seeking|need(?:ed)?)\s+(?:an?\s+)?([a-z][a-z\s\-&/]{2,60}?)(?:\s+(?:with|for|to|who)\b|[.,;\n]|$)",
+    re.IGNORECASE,
+)
+_EXPLICIT_TITLE_RE = re.compile(r"(?:job\s*title|title|position|role)\s*[:\-]\s*([^\n\r,|]+)", re.IGNORECASE)
+_TRAILING_ROLE_WORD_RE = re.compile(r"\b(job|position|role)\b$", re.IGNORECASE)
+_URL_RE = re.compile(r"https?://[^\s\]\)>,\"']+", re.IGNORECASE)
+_METRIC_RE = re.compile(r"\b\d+(\.\d+)?%?\b")
+_BULLET_ACTION_RE = re.compile(r"\b(built|implemented|designed|led|optimized|automated|delivered|improved)\b")
+_BULLET_IMPACT_RE = re.compile(r"\b(result|impact|reduced|increased|improved|achieved|delivered)\b")
+_STORY_SPLIT_RE = re.compile(r"[.\n]+")
+_STORY_IMPACT_RE = re.compile(r"\b(improved|increased|reduced|delivered|built|implemented|led)\b")
 
 async def analyze_resume(text:str):
-    known = [s for s in COMMON_SKILLS if s.lower() in text.lower()]
+    known = get_taxonomy().skill_matcher.find(text)
     inferred = _extract_general_keywords(text, limit=18)
     merged = []
     seen = set()
@@ -42,24 +39,71 @@ async def analyze_resume(text:str):
     return {"skills": merged[:20]}
 
 async def analyze_job(text:str):
-    role_title = _extract_role_title(text)
-    role_family = _detect_role_family(text, role_title)
-
-    template_skills = []
-    lowered = f"{text} {role_title}".lower()
-    for role_key, skills in ROLE_SKILL_TEMPLATES.items():
-        if role_key in lowered:
-            template_skills = skills
-            break
+    return get_job_analysis(text)
+
+
+def get_job_analysis(text: str):
+    """Synchronous `analyze_job`, for worker threads: the cached analysis of a JD."""
+    key = job_analysis_key(text)
+    analysis = _JOB_ANALYSES.get(key)
+    if analysis is None:
+        analysis = _analyze_job_uncached(text)
+        _JOB_ANALYSES.set(key, analysis)
+    # Callers get their own list so the cached entry cannot be mutated through them.
+    return {**analysis, "required_skills": list(analysis["required_skills"])}
+
+
+async def prewarm_job_analysis(texts):
+    """Analyze and cache known job descriptions ahead of traffic; returns how many were not cached yet."""
+    added = 0
+    for text in texts:
+        if not (text or "").strip():
+            continue
+        key = job_analysis_key(text)
+        if key not in _JOB_ANALYSES:
+            _JOB_ANALYSES.set(key, _analyze_job_uncached(text))
+            added += 1
+    return added
+
+
+def job_analysis_cache_stats():
+    stats = _JOB_ANALYSES.stats()
+    lookups = stats["hits"] + stats["misses"]
+    return {
+        **stats,
+        "max_entries": _JOB_ANALYSES.max_entries,
+        "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+    }
+
+
+def job_analysis_key(text: str):
+    """
+    Cache key for a JD: hash of its case-folded text with whitespace collapsed inside
+    lines and blank lines dropped, plus the taxonomy revision. Line breaks are kept
+    because role-title extraction reads the first line. JDs differing only in case
+    share one entry, so an explicit title keeps the capitalization first seen.
+    """
+    lines = (" ".join(line.split()) for line in (text or "").lower().splitlines())
+    normalized = "\n".join(line for line in lines if line)
+    return f"{hashlib.sha256(normalized.encode('utf-8')).hexdigest()}:{get_taxonomy().revision}"
+
 
-    skills = _extract_role_keywords(text, limit=14)
+def _analyze_job_uncached(text: str):
+    context = get_job_context(text)
+    taxonomy = context.taxonomy
+    role_title = context.role_title
+    role_family = context.role_family
+
+    template_skills = taxonomy.role_template_skills(f"{text} {role_title}")
+
+    skills = context.keywords(14)
     if not skills:
         skills = _extract_general_keywords(text, limit=10)
     merged = []
     seen = set()
     for item in template_skills + skills:
-        normalized = _normalize_skill(item)
-        if not normalized or normalized in GENERIC_NON_SKILLS:
+        normalized = normalize_skill(item)
+        if not normalized or normalized in taxonomy.generic_non_skills:
             continue
         if normalized in seen:
             continue
@@ -68,48 +112,18 @@ async def analyze_job(text:str):
 
     return {"required_skills": merged[:14], "role_title": role_title, "role_family": role_family}
 
+def match_resume_to_job(resume_data, job_data):
+    """Matched skills, missing skills and match score from one pass over the skill index."""
+    return match_skills(resume_data.get("skills", []), job_data.get("required_skills", []))
+
 def calculate_match(resume_data,job_data):
-    job_skills = list(dict.fromkeys(job_data["required_skills"]))
-    if not job_skills:
-        return 0
-    matched = get_matched_skills(resume_data, job_data)
-    return int(len(matched) / len(job_skills) * 100)
+    return match_resume_to_job(resume_data, job_data).score
 
 def detect_skill_gap(resume_data,job_data):
-    matched = set(get_matched_skills(resume_data, job_data))
-    job_skills = list(dict.fromkeys(job_data["required_skills"]))
-    return [skill for skill in job_skills if skill not in matched]
-
-
-def _normalize_skill(skill: str):
-    cleaned = re.sub(r"[^a-z0-9\s]+", " ", (skill or "").lower())
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
-    return cleaned
-
-
-def _is_skill_match(resume_skill: str, job_skill: str):
-    r = _normalize_skill(resume_skill)
-    j = _normalize_skill(job_skill)
-    if not r or not j:
-        return False
-    if r == j:
-        return True
-    if r in j or j in r:
-        return True
-    # token-overlap fallback for variants like "Corporate Law" vs "Law"
-    r_tokens = set(r.split())
-    j_tokens = set(j.split())
-    return len(r_tokens.intersection(j_tokens)) > 0
-
+    return match_resume_to_job(resume_data, job_data).missing
 
 def get_matched_skills(resume_data, job_data):
-    resume_skills = resume_data.get("skills", [])
-    job_skills = list(dict.fromkeys(job_data.get("required_skills", [])))
-    matched = []
-    for js in job_skills:
-        if any(_is_skill_match(rs, js) for rs in resume_skills):
-            matched.append(js)
-    return matched
+    return match_resume_to_job(resume_data, job_data).matched
 
 def generate_improvement_suggestions(missing, role_title: str = ""):
     if not missing:
@@ -159,13 +173,6 @@ def generate_interview_questions(skills, role_title: str = "", role_family: str
         questions=["Tell me about yourself."]
     return questions[:6]
 
-STOPWORDS = {
-    "the", "and", "for", "with", "that", "this", "from", "have", "has",
-    "your", "you", "our", "are", "was", "were", "into", "about", "their",
-    "them", "then", "than", "been", "also", "but", "can", "will", "would",
-    "could", "should", "using", "used", "use", "explain", "experience"
-}
-
 RESUME_KEYWORD_STOPWORDS = STOPWORDS.union(
     {
         "job", "role", "responsibilities", "requirements", "candidate", "apply", "application",
@@ -177,56 +184,27 @@ RESUME_KEYWORD_STOPWORDS = STOPWORDS.union(
     }
 )
 
-SKILL_HINTS = {
-    "leadership": {"lead", "led", "manage", "managed", "mentor", "mentored", "ownership", "initiative"},
-    "communication": {"communicate", "communication", "present", "presentation", "collaborate", "stakeholder"},
-    "teamwork": {"team", "collaborate", "pair", "cross-functional", "support"},
-    "sql": {"query", "queries", "join", "joins", "index", "indexes", "schema", "database"},
-    "python": {"python", "pandas", "fastapi", "flask", "script", "automation"},
-    "digital marketing": {"campaign", "ctr", "cpc", "conversion", "audience", "funnel"},
-    "seo": {"keyword", "backlink", "ranking", "serp", "on-page", "organic"},
-}
-
 
 def _tokenize(text: str):
-    tokens = re.findall(r"[a-zA-Z0-9\+\#\.]+", text.lower())
-    cleaned = []
-    for token in tokens:
-        normalized = token.strip(".,:;!?()[]{}\"'`")
-        normalized = normalized.strip("+-/#")
-        if normalized:
-            cleaned.append(normalized)
-    return [t for t in cleaned if len(t) > 2 and t not in STOPWORDS]
+    return tokenize_document(text).tokens
 
 
-def _extract_general_keywords(text: str, limit: int = 12):
-    tokens = _tokenize(text)
-    freq = {}
-    for token in tokens:
-        if token in RESUME_KEYWORD_STOPWORDS:
-            continue
-        if token.isdigit():
-            continue
-        if len(token) < 3:
-            continue
-        freq[token] = freq.get(token, 0) + 1
-
-    ranked_tokens = sorted(freq.items(), key=lambda kv: (-kv[1], kv[0]))
-    aliases = {
-        "apis": "API",
-        "api": "API",
-        "aws": "AWS",
-        "seo": "SEO",
-        "sql": "SQL",
-        "etl": "ETL",
-        "ui": "UI",
-        "ux": "UX",
-        "hr": "HR",
-    }
+def _is_keyword_noise(token: str):
+    return token in RESUME_KEYWORD_STOPWORDS or token.isdigit()
+
+
+def _ranked_keyword_tokens(counts):
+    # Lazy top-k: callers stop popping once they have kept `limit` keywords.
+    for token, _ in iter_top_terms(counts, skip=_is_keyword_noise):
+        yield token
+
+
+def _top_general_keywords(counts, limit: int):
+    taxonomy = get_taxonomy()
     output = []
-    for token, _ in ranked_tokens:
-        cleaned = aliases.get(token, token.capitalize())
-        if cleaned.lower() in GENERIC_NON_SKILLS:
+    for token in _ranked_keyword_tokens(counts):
+        cleaned = taxonomy.alias("general_keywords", token, token.capitalize())
+        if cleaned.lower() in taxonomy.generic_non_skills:
             continue
         output.append(cleaned)
         if len(output) >= limit:
@@ -234,6 +212,10 @@ def _extract_general_keywords(text: str, limit: int = 12):
     return output
 
 
+def _extract_general_keywords(text: str, limit: int = 12):
+    return _top_general_keywords(tokenize_document(text).counts, limit)
+
+
 def _split_question_and_answer(raw: str):
     q_marker = "question:"
     a_marker = "answer:"
@@ -263,22 +245,14 @@ def _first_nonempty_line(text: str):
 
 def _extract_role_title(job_text: str):
     lowered = job_text.lower()
-    pattern_hiring = re.search(
-        r"(?:hiring|looking\s+for|seeking|need(?:ed)?)\s+(?:an?\s+)?([a-z][a-z\s\-&/]{2,60}?)(?:\s+(?:with|for|to|who)\b|[.,;\n]|$)",
-        lowered,
-        flags=re.IGNORECASE,
-    )
+    pattern_hiring = _HIRING_TITLE_RE.search(lowered)
     if pattern_hiring:
         phrase = pattern_hiring.group(1).strip(" -")
         if phrase:
-            phrase = re.sub(r"\b(job|position|role)\b$", "", phrase, flags=re.IGNORECASE).strip(" -")
+            phrase = _TRAILING_ROLE_WORD_RE.sub("", phrase).strip(" -")
             return " ".join(word.capitalize() for word in phrase.split())
 
-    explicit = re.search(
-        r"(?:job\s*title|title|position|role)\s*[:\-]\s*([^\n\r,|]+)",
-        job_text,
-        flags=re.IGNORECASE,
-    )
+    explicit = _EXPLICIT_TITLE_RE.search(job_text)
     if explicit:
         return explicit.group(1).strip()
 
@@ -298,7 +272,7 @@ def _extract_role_title(job_text: str):
     first_line = _first_nonempty_line(job_text)
     if first_line:
         title = first_line.strip(" -|:")
-        title = re.sub(r"\b(job|position|role)\b$", "", title, flags=re.IGNORECASE).strip(" -|:")
+        title = _TRAILING_ROLE_WORD_RE.sub("", title).strip(" -|:")
         return title
     return "Target Role Candidate"
 
@@ -322,54 +296,103 @@ def _detect_role_family(job_text: str, role_title: str = ""):
     return "general"
 
 
-def _extract_role_keywords(job_text: str, limit: int = 14):
+def _iter_role_keywords(job_text: str, document: TokenizedDocument, taxonomy):
     # Prefer explicit known skills, then enrich with frequent JD nouns/terms.
-    known = [s for s in COMMON_SKILLS if s.lower() in job_text.lower()]
+    # Inferred terms are ranked lazily, so only as many as the caller consumes are popped.
+    known = taxonomy.skill_matcher.find(job_text)
+    yield from known
 
-    tokens = _tokenize(job_text)
-    freq = {}
-    for token in tokens:
-        if token in RESUME_KEYWORD_STOPWORDS:
-            continue
-        if token.isdigit():
-            continue
-        if len(token) < 3:
-            continue
-        freq[token] = freq.get(token, 0) + 1
-
-    ranked_tokens = sorted(freq.items(), key=lambda kv: (-kv[1], kv[0]))
-    aliases = {
-        "apis": "API",
-        "api": "API",
-        "aws": "AWS",
-        "seo": "SEO",
-        "sql": "SQL",
-        "etl": "ETL",
-        "ui": "UI",
-        "ux": "UX",
-    }
-    inferred = []
     seen_lower = {k.lower() for k in known}
     known_parts = set()
     for item in known:
         for part in item.lower().split():
             known_parts.add(part)
-    for token, _ in ranked_tokens:
+    for token in _ranked_keyword_tokens(document.counts):
         normalized_token = token.strip(".")
         if normalized_token in known_parts:
             continue
-        cleaned = aliases.get(normalized_token, normalized_token.capitalize())
-        if cleaned.lower() in GENERIC_NON_SKILLS:
+        cleaned = taxonomy.alias("role_keywords", normalized_token, normalized_token.capitalize())
+        if cleaned.lower() in taxonomy.generic_non_skills:
             continue
         if cleaned.lower() in seen_lower:
             continue
-        inferred.append(cleaned)
+        yield cleaned
         seen_lower.add(cleaned.lower())
-        if len(inferred) >= max(0, limit - len(known)):
-            break
 
-    combined = known + inferred
-    return combined[:limit]
+
+class JobContext:
+    """
+    Derived data for one job description, computed at most once.
+
+    The tokenized document, ranked role keywords, role title and role family are evaluated lazily
+    and shared by every pipeline stage that receives the context instead of the
+    raw JD text. Contexts are pinned to the taxonomy snapshot they were built with.
+    """
+
+    def __init__(self, job_text: str, taxonomy=None):
+        self.text = job_text or ""
+        self.taxonomy = taxonomy or get_taxonomy()
+        self._document = None
+        self._ranked_keywords = []
+        self._keyword_iter = None
+        self._keyword_lock = threading.Lock()
+        self._role_title = None
+        self._role_family = None
+
+    @property
+    def document(self):
+        if self._document is None:
+            self._document = TokenizedDocument(self.text, STOPWORDS)
+        return self._document
+
+    @property
+    def tokens(self):
+        return self.document.tokens
+
+    @property
+    def role_title(self):
+        if self._role_title is None:
+            self._role_title = _extract_role_title(self.text)
+        return self._role_title
+
+    @property
+    def role_family(self):
+        if self._role_family is None:
+            self._role_family = _detect_role_family(self.text, self.role_title)
+        return self._role_family
+
+    def keywords(self, limit: int = 14):
+        # Keywords are ranked only as far as the largest limit requested so far.
+        with self._keyword_lock:
+            if self._keyword_iter is None:
+                self._keyword_iter = _iter_role_keywords(self.text, self.document, self.taxonomy)
+            if len(self._ranked_keywords) < limit:
+                self._ranked_keywords.extend(islice(self._keyword_iter, limit - len(self._ranked_keywords)))
+            return self._ranked_keywords[:limit]
+
+
+_JOB_ANALYSES = LRUCache(max_entries=int(os.getenv("JOB_ANALYSIS_CACHE_SIZE", "1024")), ttl_seconds=None)
+
+_JOB_CONTEXTS = LRUCache(
+    max_entries=int(os.getenv("JOB_CONTEXT_CACHE_SIZE", "256")),
+    ttl_seconds=None,
+    sizeof=lambda context: len(context.text),
+)
+
+
+def get_job_context(job_text: str) -> JobContext:
+    """Shared JobContext for a JD, cached across requests by content hash and taxonomy revision."""
+    taxonomy = get_taxonomy()
+    key = f"{hashlib.sha256((job_text or '').encode('utf-8')).hexdigest()}:{taxonomy.revision}"
+    context = _JOB_CONTEXTS.get(key)
+    if context is None:
+        context = JobContext(job_text, taxonomy)
+        _JOB_CONTEXTS.set(key, context)
+    return context
+
+
+def _as_job_context(job):
+    return job if isinstance(job, JobContext) else get_job_context(job)
 
 
 def _bucket_skills(keywords):
@@ -421,7 +444,7 @@ def _role_focus_sentence(role_title: str):
 
 
 def _extract_first_matching_url(text: str, domain_hint: str = ""):
-    matches = re.findall(r"https?://[^\s\]\)>,\"']+", text or "", flags=re.IGNORECASE)
+    matches = _URL_RE.findall(text or "")
     if not matches:
         return ""
     if domain_hint:
@@ -460,8 +483,103 @@ def _preferred_links_by_role_family(role_family: str):
     return ["linkedin", "portfolio"]
 
 
+class QuestionProfile:
+    """
+    Everything answer scoring needs from one interview question, computed once.
+
+    Holds the question's token vocabulary, the skills it names (and their first
+    words, a cheap pre-check before scanning the answer), its fuzzy-match
+    keys (4-char prefix and inner substrings of each token) and one compiled
+    pattern over the hint words of every skill key it mentions, so a session that
+    scores several answers against the same question prepares them only once.
+    """
+
+    __slots__ = ("text", "vocabulary", "skills", "skill_lead_words", "fuzzy_terms", "hint_re")
+
+    def __init__(self, question: str, taxonomy=None):
+        taxonomy = taxonomy or get_taxonomy()
+        self.text = question
+        self.vocabulary = tokenize_document(question).vocabulary
+        self.skills = frozenset(taxonomy.skill_matcher.find(question))
+        # An answer can only name one of these skills if it contains the skill's first word.
+        self.skill_lead_words = frozenset(skill_tokens(skill)[0] for skill in self.skills)
+        self.fuzzy_terms = tuple((token, token[:4], _inner_substrings(token)) for token in self.vocabulary)
+        question_lower = question.lower()
+        hints = {
+            hint
+            for skill_key, skill_hints in taxonomy.skill_hints.items()
+            if skill_key in question_lower
+            for hint in skill_hints
+        }
+        # A plain alternation: search() succeeds exactly when some hint is a substring.
+        self.hint_re = re.compile("|".join(map(re.escape, sorted(hints)))) if hints else None
+
+
+def _inner_substrings(token: str):
+    # Every proper substring that could itself be a token (tokens are 3+ characters).
+    size = len(token)
+    return frozenset(token[i:j] for i in range(size) for j in range(i + 3, size + 1) if j - i < size)
+
+
+def _fuzzy_overlap(profile: QuestionProfile, a_tokens):
+    """
+    Question tokens absent from the answer that still have a close variant in it:
+    an answer token with the same 4-char prefix, containing it, or contained in it.
+
+    Answer tokens are indexed once (prefix set, one joined string for containment),
+    so the cost is linear in the answer instead of question x answer pairs.
+    """
+    if not a_tokens:
+        return 0
+    answer_prefixes = {token[:4] for token in a_tokens}
+    # Tokens never contain NUL, so a hit in the joined string lies inside one token.
+    answer_blob = "\0".join(a_tokens)
+    overlap = 0
+    for token, prefix, inner in profile.fuzzy_terms:
+        if token in a_tokens:
+            continue
+        if prefix in answer_prefixes or token in answer_blob or not a_tokens.isdisjoint(inner):
+            overlap += 1
+    return overlap
+
+
 def evaluate_answer(answer: str):
     question, candidate_answer = _split_question_and_answer(answer)
+    return score_answer(QuestionProfile(question) if question else None, candidate_answer)
+
+
+def evaluate_session(pairs):
+    """
+    Score a mock-interview session given as (question, answer) pairs.
+
+    Each distinct question is profiled once. Returns per-answer results in input
+    order plus aggregate scores over the whole session.
+    """
+    taxonomy = get_taxonomy()
+    profiles = {}
+    results = []
+    for question, candidate_answer in pairs:
+        question = (question or "").strip()
+        profile = None
+        if question:
+            profile = profiles.get(question)
+            if profile is None:
+                profile = profiles[question] = QuestionProfile(question, taxonomy)
+        results.append(score_answer(profile, (candidate_answer or "").strip()))
+
+    scores = [result["score"] for result in results]
+    aggregate = {
+        "answers": len(scores),
+        "average_score": round(sum(scores) / len(scores), 1) if scores else 0,
+        "min_score": min(scores, default=0),
+        "max_score": max(scores, default=0),
+        "sufficient_answers": sum(1 for score in scores if score >= 60),
+    }
+    return {"results": results, "aggregate": aggregate}
+
+
+def score_answer(profile, candidate_answer: str):
+    """Score `candidate_answer` against a QuestionProfile (or None when no question was given)."""
     answer_word_count = len(candidate_answer.split())
 
     if answer_word_count < 8:
@@ -473,44 +591,31 @@ def evaluate_answer(answer: str):
     # 1) Relevance score (0..45): does the answer target the asked topic?
     relevance_score = 20
     relevance_note = " The answer may not be aligned with the selected question."
-    if question:
-        q_tokens = set(_tokenize(question))
-        a_tokens = set(_tokenize(candidate_answer))
-        exact_overlap = len(q_tokens.intersection(a_tokens))
+    if profile is not None:
+        q_tokens = profile.vocabulary
+        a_tokens = tokenize_document(candidate_answer).vocabulary
+        exact_overlap = len(q_tokens & a_tokens)
 
         # Allow close variants (e.g., "leadership" vs "led") by prefix/substring similarity.
-        fuzzy_overlap = 0
-        for qt in q_tokens:
-            if qt in a_tokens:
-                continue
-            for at in a_tokens:
-                if qt[:4] == at[:4] or qt in at or at in qt:
-                    fuzzy_overlap += 1
-                    break
+        fuzzy_overlap = _fuzzy_overlap(profile, a_tokens)
 
         overlap = exact_overlap + fuzzy_overlap
         denom = max(1, min(len(q_tokens), 8))
         relevance_ratio = overlap / denom
 
         # Skill-term bonus if the asked skill itself appears in answer.
-        question_lower = question.lower()
         answer_lower = candidate_answer.lower()
         skill_bonus = 0
-        for skill in COMMON_SKILLS:
-            if skill.lower() in question_lower and skill.lower() in answer_lower:
-                skill_bonus = 0.2
-                break
+        if (
+            any(word in answer_lower for word in profile.skill_lead_words)
+            and profile.skills.intersection(get_taxonomy().skill_matcher.find(candidate_answer))
+        ):
+            skill_bonus = 0.2
 
         # Skill-hint bonus for semantically related wording.
         hint_bonus = 0
-        for skill_key, hints in SKILL_HINTS.items():
-            if skill_key in question_lower:
-                for hint in hints:
-                    if hint in answer_lower:
-                        hint_bonus = 0.45
-                        break
-                if hint_bonus:
-                    break
+        if profile.hint_re is not None and profile.hint_re.search(answer_lower):
+            hint_bonus = 0.45
 
         relevance_ratio = min(1.0, relevance_ratio + skill_bonus + hint_bonus)
         relevance_score = int(min(45, round(relevance_ratio * 45)))
@@ -535,7 +640,7 @@ def evaluate_answer(answer: str):
         completeness_score += 12
     if _contains_any(answer_lower, outcome_words):
         completeness_score += 8
-    if re.search(r"\b\d+(\.\d+)?%?\b", candidate_answer):
+    if _METRIC_RE.search(candidate_answer):
         completeness_score += 5
 
     # 3) Depth score (0..20): enough detail without rewarding length alone.
@@ -570,15 +675,16 @@ def evaluate_answer(answer: str):
     return {"score": score, "feedback": f"{sufficiency} {feedback}{relevance_note}"}
 
 async def generate_resume_reference(
-    job_text: str,
+    job_text,
     profile_text: str = "",
     linkedin: str = "",
     github: str = "",
     portfolio: str = "",
 ):
-    role_title = _extract_role_title(job_text)
-    role_family = _detect_role_family(job_text, role_title)
-    role_keywords = _extract_role_keywords(job_text)
+    job = _as_job_context(job_text)
+    role_title = job.role_title
+    role_family = job.role_family
+    role_keywords = job.keywords(14)
     skill_buckets = _bucket_skills(role_keywords)
 
     top_keywords = role_keywords[:5]
@@ -917,9 +1023,9 @@ def _collect_resume_bullets(reference: dict):
 
 def _score_single_bullet(bullet: str, job_keywords):
     lowered = bullet.lower()
-    has_action = bool(re.search(r"\b(built|implemented|designed|led|optimized|automated|delivered|improved)\b", lowered))
-    has_metric = bool(re.search(r"\b\d+(\.\d+)?%?\b", bullet))
-    has_impact = bool(re.search(r"\b(result|impact|reduced|increased|improved|achieved|delivered)\b", lowered))
+    has_action = bool(_BULLET_ACTION_RE.search(lowered))
+    has_metric = bool(_METRIC_RE.search(bullet))
+    has_impact = bool(_BULLET_IMPACT_RE.search(lowered))
 
     keyword_hits = 0
     for keyword in job_keywords[:10]:
@@ -957,8 +1063,8 @@ def _score_single_bullet(bullet: str, job_keywords):
     }
 
 
-def score_resume_bullets(reference: dict, job_text: str):
-    job_keywords = _extract_role_keywords(job_text)
+def score_resume_bullets(reference: dict, job_text):
+    job_keywords = _as_job_context(job_text).keywords(14)
     bullet_rows = []
     for row in _collect_resume_bullets(reference):
         scoring = _score_single_bullet(row["text"], job_keywords)
@@ -997,8 +1103,8 @@ def generate_evidence_links(reference: dict):
     return output
 
 
-def generate_gap_autopilot_plan(job_text: str, reference: dict):
-    required_keywords = _extract_role_keywords(job_text, limit=12)
+def generate_gap_autopilot_plan(job_text, reference: dict):
+    required_keywords = _as_job_context(job_text).keywords(12)
     current_skills = {s.lower() for s in reference.get("skills", [])}
     missing = [k for k in required_keywords if k.lower() not in current_skills][:6]
 
@@ -1015,13 +1121,18 @@ def generate_gap_autopilot_plan(job_text: str, reference: dict):
     }
 
 
-def simulate_recruiter_review(reference: dict, job_text: str):
-    resume_text = format_resume_reference(reference).lower()
-    job_keywords = _extract_role_keywords(job_text, limit=12)
+def simulate_recruiter_review(reference: dict, job_text, resume_text: str = None, bullet_quality: dict = None):
+    job = _as_job_context(job_text)
+    if resume_text is None:
+        resume_text = format_resume_reference(reference)
+    resume_text = resume_text.lower()
+    job_keywords = job.keywords(12)
     keyword_hits = sum(1 for k in job_keywords if k.lower() in resume_text)
     coverage = int((keyword_hits / max(1, len(job_keywords))) * 100)
 
-    bullet_quality = score_resume_bullets(reference, job_text)["average_score"]
+    if bullet_quality is None:
+        bullet_quality = score_resume_bullets(reference, job)
+    bullet_quality = bullet_quality["average_score"]
     section_bonus = 100 if all(reference.get(section) for section in ["summary", "skills", "experience", "projects", "education"]) else 70
 
     ats_score = int(0.6 * coverage + 0.4 * section_bonus)
@@ -1042,10 +1153,11 @@ def simulate_recruiter_review(reference: dict, job_text: str):
     }
 
 
-def generate_role_variants(reference: dict, job_text: str):
+def generate_role_variants(reference: dict, job_text):
+    job = _as_job_context(job_text)
     base_summary = reference.get("summary", "")
-    role_title = _extract_role_title(job_text)
-    role_family = _detect_role_family(job_text, role_title)
+    role_title = job.role_title
+    role_family = job.role_family
     skills = reference.get("skills", [])
     variants = []
 
@@ -1092,12 +1204,12 @@ def generate_role_variants(reference: dict, job_text: str):
 def convert_interview_to_bullets(interview_story: str):
     if not interview_story.strip():
         return []
-    chunks = re.split(r"[.\n]+", interview_story)
+    chunks = _STORY_SPLIT_RE.split(interview_story)
     chunks = [c.strip() for c in chunks if c.strip()]
     bullets = []
     for chunk in chunks[:3]:
         sentence = chunk[0].upper() + chunk[1:] if len(chunk) > 1 else chunk.upper()
-        if not re.search(r"\b(improved|increased|reduced|delivered|built|implemented|led)\b", sentence.lower()):
+        if not _STORY_IMPACT_RE.search(sentence.lower()):
             sentence = f"Delivered impact by {sentence.lower()}."
         if not sentence.endswith("."):
             sentence += "."
@@ -1134,10 +1246,14 @@ def check_portfolio_consistency(reference: dict, portfolio_text: str):
     }
 
 
-def benchmark_against_top_candidates(reference: dict, job_text: str):
-    bullet_scores = score_resume_bullets(reference, job_text)
+def benchmark_against_top_candidates(reference: dict, job_text, bullet_scores: dict = None, recruiter_review: dict = None):
+    job = _as_job_context(job_text)
+    if bullet_scores is None:
+        bullet_scores = score_resume_bullets(reference, job)
     avg_bullet = bullet_scores.get("average_score", 0)
-    keyword_coverage = simulate_recruiter_review(reference, job_text)["personas"][0]["score"]
+    if recruiter_review is None:
+        recruiter_review = simulate_recruiter_review(reference, job, bullet_quality=bullet_scores)
+    keyword_coverage = recruiter_review["personas"][0]["score"]
     proof_count = len(generate_evidence_links(reference))
     project_count = len(reference.get("projects", []))
 
@@ -1154,6 +1270,20 @@ def benchmark_against_top_candidates(reference: dict, job_text: str):
     }
 
 
+INTELLIGENCE_SECTIONS = (
+    "resume_reference",
+    "resume_text",
+    "evidence_links",
+    "gap_autopilot",
+    "recruiter_simulation",
+    "bullet_quality",
+    "role_variants",
+    "interview_bullets",
+    "portfolio_consistency",
+    "benchmark_panel",
+)
+
+
 async def build_resume_intelligence(
     job_text: str,
     profile_text: str = "",
@@ -1162,42 +1292,76 @@ async def build_resume_intelligence(
     linkedin: str = "",
     github: str = "",
     portfolio: str = "",
+    executor=None,
+    sections=None,
 ):
-    reference = await generate_resume_reference(
-        job_text,
-        profile_text,
-        linkedin=linkedin,
-        github=github,
-        portfolio=portfolio,
+    """
+    Run the resume-intelligence stages over one shared JD context.
+
+    Stages after the reference only read it, so independent ones run concurrently
+    on `executor` (inline when None); shared intermediates such as the rendered
+    resume text and bullet scores are computed once. `sections` (names from
+    INTELLIGENCE_SECTIONS, default all) limits both the response and the work to
+    those sections and what they depend on; unknown names raise ValueError.
+    `stage_timings_ms` reports the wall time of each stage that ran.
+    """
+    if sections is not None:
+        unknown = [name for name in sections if name not in INTELLIGENCE_SECTIONS]
+        if unknown:
+            raise ValueError(
+                f"Unknown section(s): {', '.join(unknown)}. Choose from: {', '.join(INTELLIGENCE_SECTIONS)}."
+            )
+    job = get_job_context(job_text)
+
+    async def resume_reference(interview_bullets):
+        reference = await generate_resume_reference(
+            job,
+            profile_text,
+            linkedin=linkedin,
+            github=github,
+            portfolio=portfolio,
+        )
+        if interview_bullets:
+            reference.setdefault("experience", [])
+            if reference["experience"]:
+                reference["experience"][0].setdefault("bullets", [])
+                reference["experience"][0]["bullets"] = interview_bullets + reference["experience"][0]["bullets"]
+        return reference
+
+    graph = (
+        StageGraph()
+        .add("interview_bullets", lambda: convert_interview_to_bullets(interview_story))
+        .add("resume_reference", resume_reference, "interview_bullets")
+        .add("resume_text", lambda resume_reference: format_resume_reference(resume_reference), "resume_reference")
+        .add("bullet_quality", lambda resume_reference: score_resume_bullets(resume_reference, job), "resume_reference")
+        .add("evidence_links", lambda resume_reference: generate_evidence_links(resume_reference), "resume_reference")
+        .add("gap_autopilot", lambda resume_reference: generate_gap_autopilot_plan(job, resume_reference), "resume_reference")
+        .add(
+            "recruiter_simulation",
+            lambda resume_reference, resume_text, bullet_quality: simulate_recruiter_review(
+                resume_reference, job, resume_text=resume_text, bullet_quality=bullet_quality
+            ),
+            "resume_reference", "resume_text", "bullet_quality",
+        )
+        .add("role_variants", lambda resume_reference: generate_role_variants(resume_reference, job), "resume_reference")
+        .add(
+            "portfolio_consistency",
+            lambda resume_reference: check_portfolio_consistency(resume_reference, portfolio_text),
+            "resume_reference",
+        )
+        .add(
+            "benchmark_panel",
+            lambda resume_reference, bullet_quality, recruiter_simulation: benchmark_against_top_candidates(
+                resume_reference, job, bullet_scores=bullet_quality, recruiter_review=recruiter_simulation
+            ),
+            "resume_reference", "bullet_quality", "recruiter_simulation",
+        )
     )
-    story_bullets = convert_interview_to_bullets(interview_story)
-    if story_bullets:
-        reference.setdefault("experience", [])
-        if reference["experience"]:
-            reference["experience"][0].setdefault("bullets", [])
-            reference["experience"][0]["bullets"] = story_bullets + reference["experience"][0]["bullets"]
-
-    resume_text = format_resume_reference(reference)
-    bullet_quality = score_resume_bullets(reference, job_text)
-    evidence = generate_evidence_links(reference)
-    gap_plan = generate_gap_autopilot_plan(job_text, reference)
-    recruiter_simulation = simulate_recruiter_review(reference, job_text)
-    variants = generate_role_variants(reference, job_text)
-    consistency = check_portfolio_consistency(reference, portfolio_text)
-    benchmark = benchmark_against_top_candidates(reference, job_text)
+    results, timings_ms = await graph.run(executor, targets=sections)
 
-    return {
-        "resume_reference": reference,
-        "resume_text": resume_text,
-        "evidence_links": evidence,
-        "gap_autopilot": gap_plan,
-        "recruiter_simulation": recruiter_simulation,
-        "bullet_quality": bullet_quality,
-        "role_variants": variants,
-        "interview_bullets": story_bullets,
-        "portfolio_consistency": consistency,
-        "benchmark_panel": benchmark,
-    }
+    output = {name: results[name] for name in INTELLIGENCE_SECTIONS if sections is None or name in sections}
+    output["stage_timings_ms"] = timings_ms
+    return output
 
 
 async def generate_explanation(score):
@@ -0,0 +1,550 @@
+import asyncio
+import base64
+import html
+import os
+import queue
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+HISTORY_COLUMNS = "id, mode, title, summary, job, created_at"
+
+# Newest first; both queries are range scans of idx_search_history_client_ts.
+_SELECT_PAGE = f"""
+    SELECT {HISTORY_COLUMNS}, created_ts
+    FROM search_history
+    WHERE client_id = ?
+    ORDER BY created_ts DESC, id DESC
+    LIMIT ?
+"""
+_SELECT_PAGE_AFTER = f"""
+    SELECT {HISTORY_COLUMNS}, created_ts
+    FROM search_history
+    WHERE client_id = ? AND (created_ts, id) < (?, ?)
+    ORDER BY created_ts DESC, id DESC
+    LIMIT ?
+"""
+_INSERT = f"""
+    INSERT INTO search_history (client_id, mode, title, summary, job, created_at, created_ts)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    RETURNING {HISTORY_COLUMNS}
+"""
+_SEARCH = """
+    SELECT
+        h.id, h.mode, h.created_at,
+        highlight(search_history_fts, 0, char(2), char(3)) AS title,
+        snippet(search_history_fts, 1, char(2), char(3), '...', 16) AS summary,
+        snippet(search_history_fts, 2, char(2), char(3), '...', 24) AS job,
+        bm25(search_history_fts, 5.0, 2.0, 1.0, 0.0) AS rank
+    FROM search_history_fts
+    JOIN search_history h ON h.id = search_history_fts.rowid
+    WHERE search_history_fts MATCH ? AND h.client_id = ?
+    ORDER BY rank, h.id DESC
+    LIMIT ? OFFSET ?
+"""
+# Highlight markers used inside the SQL above, swapped for <mark> tags after the text is HTML-escaped.
+_MARK_START, _MARK_END = "\x02", "\x03"
+_DELETE_FOR_CLIENT = "DELETE FROM search_history WHERE client_id = ?"
+_DELETE_ONE = "DELETE FROM search_history WHERE id = ? AND client_id = ?"
+
+
+class HistoryQueueFull(Exception):
+    """Raised when the write-behind queue already holds its maximum of pending inserts."""
+
+
+def fts_query(text: str):
+    """
+    Safe FTS5 MATCH expression for free-text input: every word is quoted (so
+    operators and punctuation are literal), words are ANDed and the last word
+    also matches as a prefix. Empty string when there is nothing to search for.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return ""
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def fts_client_key(client_id: str):
+    """
+    The single FTS token that stands for `client_id`: the hex of its UTF-8 bytes,
+    as SQLite's hex() spells it. The trailing digit keeps the porter stemmer from
+    rewriting hex that happens to end in a suffix such as "ed".
+    """
+    return client_id.encode("utf-8").hex().upper() + "0"
+
+
+def _marked_html(text: str):
+    return html.escape(text or "").replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _timestamp_us(value: str):
+    """Microseconds since the epoch for a stored ISO-8601 timestamp (naive values are UTC)."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return 0
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1_000_000)
+
+
+def encode_cursor(created_ts: int, item_id: int):
+    return base64.urlsafe_b64encode(f"{created_ts}:{item_id}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """(created_ts, id) from an opaque page cursor; ValueError when it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        created_ts, item_id = raw.split(":")
+        return int(created_ts), int(item_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid history cursor.") from exc
+
+
+def _migration_1(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS search_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id TEXT NOT NULL,
+            mode TEXT NOT NULL,
+            title TEXT NOT NULL,
+            summary TEXT NOT NULL,
+            job TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+
+
+def _migration_2(conn):
+    # Sortable integer timestamp plus a covering order for per-client pages.
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(search_history)")}
+    if "created_ts" not in columns:
+        conn.execute("ALTER TABLE search_history ADD COLUMN created_ts INTEGER NOT NULL DEFAULT 0")
+    rows = conn.execute("SELECT id, created_at FROM search_history WHERE created_ts = 0").fetchall()
+    conn.executemany(
+        "UPDATE search_history SET created_ts = ? WHERE id = ?",
+        [(_timestamp_us(row["created_at"]), row["id"]) for row in rows],
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_search_history_client_ts
+        ON search_history (client_id, created_ts DESC, id DESC)
+        """
+    )
+
+
+def _migration_3(conn):
+    # Full-text index kept in sync by triggers. Rows that existed before this
+    # migration are indexed later, in small chunks, by HistoryStore's backfill
+    # thread; history_meta records how far it has got.
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_history_fts USING fts5(
+            title, summary, job, client_id UNINDEXED, tokenize = 'porter unicode61'
+        )
+        """
+    )
+    for statement in (
+        """
+        CREATE TRIGGER IF NOT EXISTS search_history_fts_insert AFTER INSERT ON search_history BEGIN
+            INSERT INTO search_history_fts (rowid, title, summary, job, client_id)
+            VALUES (new.id, new.title, new.summary, new.job, new.client_id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS search_history_fts_delete AFTER DELETE ON search_history BEGIN
+            DELETE FROM search_history_fts WHERE rowid = old.id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS search_history_fts_update AFTER UPDATE ON search_history BEGIN
+            DELETE FROM search_history_fts WHERE rowid = old.id;
+            INSERT INTO search_history_fts (rowid, title, summary, job, client_id)
+            VALUES (new.id, new.title, new.summary, new.job, new.client_id);
+        END
+        """,
+        "CREATE TABLE IF NOT EXISTS history_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    ):
+        conn.execute(statement)
+    high = conn.execute("SELECT COALESCE(MAX(id), 0) FROM search_history").fetchone()[0]
+    if high:
+        conn.executemany(
+            "INSERT OR REPLACE INTO history_meta (key, value) VALUES (?, ?)",
+            [("fts_backfill_high", high), ("fts_backfill_done", 0)],
+        )
+
+
+def _migration_4(conn):
+    # Index the client as a token (see fts_client_key) so a search only walks
+    # that client's postings, instead of matching every client and filtering after.
+    for trigger in ("insert", "delete", "update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS search_history_fts_{trigger}")
+    conn.execute("DROP TABLE IF EXISTS search_history_fts")
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE search_history_fts USING fts5(
+            title, summary, job, client_key, tokenize = 'porter unicode61'
+        )
+        """
+    )
+    for statement in (
+        """
+        CREATE TRIGGER search_history_fts_insert AFTER INSERT ON search_history BEGIN
+            INSERT INTO search_history_fts (rowid, title, summary, job, client_key)
+            VALUES (new.id, new.title, new.summary, new.job, hex(new.client_id) || '0');
+        END
+        """,
+        """
+        CREATE TRIGGER search_history_fts_delete AFTER DELETE ON search_history BEGIN
+            DELETE FROM search_history_fts WHERE rowid = old.id;
+        END
+        """,
+        """
+        CREATE TRIGGER search_history_fts_update AFTER UPDATE ON search_history BEGIN
+            DELETE FROM search_history_fts WHERE rowid = old.id;
+            INSERT INTO search_history_fts (rowid, title, summary, job, client_key)
+            VALUES (new.id, new.title, new.summary, new.job, hex(new.client_id) || '0');
+        END
+        """,
+    ):
+        conn.execute(statement)
+    # Existing rows are re-indexed by the backfill thread.
+    conn.execute("DELETE FROM history_meta WHERE key IN ('fts_backfill_high', 'fts_backfill_done')")
+    high = conn.execute("SELECT COALESCE(MAX(id), 0) FROM search_history").fetchone()[0]
+    if high:
+        conn.executemany(
+            "INSERT INTO history_meta (key, value) VALUES (?, ?)",
+            [("fts_backfill_high", high), ("fts_backfill_done", 0)],
+        )
+
+
+# Applied in order; PRAGMA user_version records how many have run.
+MIGRATIONS = (_migration_1, _migration_2, _migration_3, _migration_4)
+
+
+class HistoryStore:
+    """
+    Search history storage backed by a small pool of persistent SQLite connections.
+
+    Connections are opened once in WAL mode with `synchronous=NORMAL`, so commits
+    do not fsync the main database file and readers never block the writer. Each
+    connection keeps its own prepared-statement cache for the fixed SQL above.
+    The async methods run the blocking sqlite3 calls on a dedicated thread pool
+    sized to the connection pool, keeping them off the event loop.
+
+    Inserts are write-behind: a single writer thread drains a bounded queue and
+    commits everything that arrived within `write_interval_seconds` (up to
+    `write_batch_size` rows) in one transaction, reading the new rows back through
+    `RETURNING`. `close()` flushes the queue before the connections are closed.
+
+    `search` queries an FTS5 index of title, summary and job that also holds a
+    per-client token, so a search only touches the caller's rows. Rows that predate
+    the index are backfilled by a background thread `fts_backfill_chunk` rows per
+    transaction, so migrating a large database never holds the write lock for long;
+    until it finishes, search results may miss older rows.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pool_size: int = 4,
+        fallback_dir: str = "",
+        write_interval_seconds: float = 0.01,
+        write_batch_size: int = 256,
+        write_queue_max: int = 1000,
+        fts_backfill_chunk: int = 500,
+    ):
+        self.pool_size = max(1, pool_size)
+        self.db_path = self._usable_path(db_path, fallback_dir or tempfile.gettempdir())
+        self._connections = queue.LifoQueue()
+        self._opened = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="history-db")
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self.schema_version = self._migrate(conn)
+
+        self.write_interval_seconds = write_interval_seconds
+        self.write_batch_size = max(1, write_batch_size)
+        self._pending = queue.Queue(maxsize=max(1, write_queue_max))
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+
+        self.fts_backfill_chunk = max(1, fts_backfill_chunk)
+        self._stop_backfill = threading.Event()
+        self._backfill = threading.Thread(target=self._backfill_loop, name="history-fts-backfill", daemon=True)
+        self._backfill.start()
+
+    @staticmethod
+    def _migrate(conn):
+        """Run pending MIGRATIONS, each in its own transaction together with its version bump."""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                # Another worker may have migrated while this one waited for the write lock.
+                if conn.execute("PRAGMA user_version").fetchone()[0] >= number:
+                    continue
+                migration(conn)
+                conn.execute(f"PRAGMA user_version = {number}")
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    @staticmethod
+    def _usable_path(db_path: str, fallback_dir: str):
+        try:
+            db_dir = os.path.dirname(db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            sqlite3.connect(db_path).close()
+            return db_path
+        except (OSError, sqlite3.OperationalError):
+            # Last-resort fallback so history feature keeps working even if path is not writable.
+            return os.path.join(fallback_dir, os.path.basename(db_path))
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0, cached_statements=64)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-8192")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        try:
+            conn = self._connections.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if len(self._opened) < self.pool_size:
+                    conn = self._open()
+                    self._opened.append(conn)
+                else:
+                    conn = None
+            if conn is None:
+                conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _page(self, client_id: str, limit: int, cursor: str):
+        with self._connection() as conn:
+            if cursor:
+                created_ts, item_id = decode_cursor(cursor)
+                rows = conn.execute(_SELECT_PAGE_AFTER, (client_id, created_ts, item_id, limit + 1)).fetchall()
+            else:
+                rows = conn.execute(_SELECT_PAGE, (client_id, limit + 1)).fetchall()
+        items = [dict(row) for row in rows[:limit]]
+        next_cursor = ""
+        if len(rows) > limit and items:
+            next_cursor = encode_cursor(items[-1]["created_ts"], items[-1]["id"])
+        for item in items:
+            del item["created_ts"]
+        return items, next_cursor
+
+    def _write_loop(self):
+        while True:
+            entry = self._pending.get()
+            if entry is None:
+                return
+            batch = [entry]
+            stopping = False
+            deadline = time.monotonic() + self.write_interval_seconds
+            while len(batch) < self.write_batch_size:
+                try:
+                    entry = self._pending.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self._write_batch(batch)
+            if stopping:
+                return
+
+    def _write_batch(self, batch):
+        # Rows are written even if the waiting request was cancelled; only its result is dropped.
+        waiting = [future.set_running_or_notify_cancel() for _, future in batch]
+        try:
+            with self._connection() as conn:
+                with conn:
+                    saved = [dict(conn.execute(_INSERT, row).fetchone()) for row, _ in batch]
+        except Exception as exc:
+            # Any failure (sqlite or a malformed row) fails this batch only; the writer keeps running.
+            for (_, future), is_waiting in zip(batch, waiting):
+                if is_waiting:
+                    future.set_exception(exc)
+            return
+        for (_, future), is_waiting, row in zip(batch, waiting, saved):
+            if is_waiting:
+                future.set_result(row)
+
+    def _backfill_state(self, conn):
+        rows = dict(conn.execute(
+            "SELECT key, value FROM history_meta WHERE key IN ('fts_backfill_high', 'fts_backfill_done')"
+        ).fetchall())
+        if "fts_backfill_high" not in rows:
+            return None
+        return rows["fts_backfill_done"], rows["fts_backfill_high"]
+
+    def _backfill_loop(self):
+        while not self._stop_backfill.is_set():
+            try:
+                if not self._backfill_step():
+                    return
+            except sqlite3.OperationalError:
+                # Busy database; try again shortly.
+                self._stop_backfill.wait(0.05)
+                continue
+            except sqlite3.Error:
+                # Anything else is unexpected; back off rather than let the backfill thread die.
+                self._stop_backfill.wait(1.0)
+                continue
+            self._stop_backfill.wait(0.05)
+
+    def _backfill_step(self):
+        """Index the next chunk of pre-existing rows. False once nothing is left to do."""
+        with self._connection() as conn:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                state = self._backfill_state(conn)
+                if state is None:
+                    return False
+                done, high = state
+                upper = conn.execute(
+                    "SELECT MAX(id) FROM (SELECT id FROM search_history WHERE id > ? AND id <= ? ORDER BY id LIMIT ?)",
+                    (done, high, self.fts_backfill_chunk),
+                ).fetchone()[0]
+                if upper is None:
+                    conn.execute("DELETE FROM history_meta WHERE key IN ('fts_backfill_high', 'fts_backfill_done')")
+                    return False
+                # Rows updated since the migration were already re-indexed by the triggers;
+                # REPLACE overwrites those entries instead of failing on the duplicate rowid.
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO search_history_fts (rowid, title, summary, job, client_key)
+                    SELECT id, title, summary, job, hex(client_id) || '0' FROM search_history WHERE id > ? AND id <= ?
+                    """,
+                    (done, upper),
+                )
+                conn.execute("UPDATE history_meta SET value = ? WHERE key = 'fts_backfill_done'", (upper,))
+        return True
+
+    def _search(self, client_id: str, query: str, limit: int, offset: int):
+        with self._connection() as conn:
+            backfill_pending = self._backfill_state(conn) is not None
+            rows = []
+            if query:
+                # The client token narrows the match to this client's rows; user terms only search the text columns.
+                match = f'client_key : "{fts_client_key(client_id)}" AND {{title summary job}} : ({query})'
+                rows = conn.execute(_SEARCH, (match, client_id, limit + 1, offset)).fetchall()
+        results = [dict(row) for row in rows[:limit]]
+        for row in results:
+            row["rank"] = round(-row["rank"], 4)
+            for column in ("title", "summary", "job"):
+                row[column] = _marked_html(row[column])
+        return {
+            "results": results,
+            "next_offset": offset + limit if len(rows) > limit else None,
+            "backfill_pending": backfill_pending,
+        }
+
+    def _execute(self, sql: str, params):
+        with self._connection() as conn:
+            with conn:
+                return conn.execute(sql, params).rowcount
+
+    async def page(self, client_id: str, limit: int = 50, cursor: str = ""):
+        """One page of a client's history, newest first: (items, next_cursor or "")."""
+        return await self._run(self._page, client_id, limit, cursor)
+
+    async def add(self, client_id: str, item: dict, wait: bool = True):
+        """
+        Queue a history row for the next batched commit.
+
+        With `wait=True` this returns the stored row (including its id) once the
+        batch is committed, marked `durable: True`. With `wait=False` it returns
+        immediately with `id: None` and `durable: False`; the row is lost if the
+        process dies before the next flush.
+        """
+        if self._closed or not self._writer.is_alive():
+            raise RuntimeError("History store is closed.")
+        created_at = datetime.now(timezone.utc).isoformat()
+        row = (client_id, item["mode"], item["title"], item["summary"], item["job"], created_at, _timestamp_us(created_at))
+        future = Future()
+        try:
+            self._pending.put_nowait((row, future))
+        except queue.Full:
+            raise HistoryQueueFull("History writes are backed up. Retry shortly.")
+        if not wait:
+            return {
+                "id": None,
+                "mode": item["mode"],
+                "title": item["title"],
+                "summary": item["summary"],
+                "job": item["job"],
+                "created_at": created_at,
+                "durable": False,
+            }
+        saved = await asyncio.wrap_future(future)
+        return {**saved, "durable": True}
+
+    async def search(self, client_id: str, text: str, limit: int = 20, offset: int = 0):
+        """
+        Ranked full-text search of one client's history.
+
+        Matches in title weigh more than summary, which weighs more than the JD
+        text; `title` is returned highlighted and `summary`/`job` as snippets. All
+        three are HTML-escaped, with only the matches wrapped in <mark>. `rank` is the BM25 relevance (higher is better).
+        """
+        return await self._run(self._search, client_id, fts_query(text), limit, offset)
+
+    async def clear(self, client_id: str):
+        return await self._run(self._execute, _DELETE_FOR_CLIENT, (client_id,))
+
+    async def delete(self, client_id: str, item_id: int):
+        return await self._run(self._execute, _DELETE_ONE, (item_id, client_id))
+
+    def close(self, timeout_seconds: float = 10.0):
+        self._stop_backfill.set()
+        self._backfill.join()
+        if not self._closed:
+            self._closed = True
+            try:
+                self._pending.put(None, timeout=timeout_seconds)
+            except queue.Full:
+                pass
+            self._writer.join(timeout_seconds)
+            # Rows that raced in behind the stop marker (or that a stuck writer never reached).
+            late = []
+            while True:
+                try:
+                    entry = self._pending.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is not None:
+                    late.append(entry)
+            if late:
+                self._write_batch(late)
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._opened:
+                conn.close()
+            self._opened.clear()
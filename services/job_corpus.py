@@ -0,0 +1,270 @@
+import asyncio
+import heapq
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from services.ai_service import get_job_analysis
+from services.match_engine import ResumeSkillIndex, normalize_skill
+from services.relevance import RelevanceIndex
+
+
+class JobCorpus:
+    """
+    Local store of job postings for reverse search ("which postings fit this resume?").
+
+    `analyze_job` runs once at ingest and its output (required skills, role title,
+    role family) is stored with the posting. An in-memory inverted index maps each
+    normalized skill token to the postings that require it, so a top-k query only
+    scores postings sharing at least one token with the resume instead of the
+    whole corpus. A posting that would only match through substring containment
+    (e.g. "Java" vs "JavaScript") without a shared token is not a candidate.
+
+    Posting texts also feed a RelevanceIndex, which provides corpus-level IDF for
+    the TF-IDF / BM25 match modes.
+
+    Ingest analysis and every SQLite statement run on a private two-thread pool;
+    a bulk ingest of thousands of postings never holds the event loop.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._postings = {}
+        self._token_index = {}
+        self.relevance = RelevanceIndex()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="job-corpus")
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job_postings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                text TEXT NOT NULL,
+                required_skills TEXT NOT NULL,
+                role_title TEXT NOT NULL,
+                role_family TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self._load()
+
+    def __len__(self):
+        return len(self._postings)
+
+    def _load(self):
+        rows = self._conn.execute(
+            "SELECT id, title, text, required_skills, role_title, role_family, updated_at FROM job_postings"
+        ).fetchall()
+        with self._lock:
+            for row in rows:
+                posting = dict(row)
+                text = posting.pop("text")
+                posting["required_skills"] = json.loads(posting["required_skills"])
+                self._index(posting, text)
+
+    def _index(self, posting: dict, text: str):
+        self._unindex(posting["id"])
+        self._postings[posting["id"]] = posting
+        self.relevance.add(posting["id"], text)
+        for token in _skill_tokens(posting["required_skills"]):
+            self._token_index.setdefault(token, set()).add(posting["id"])
+
+    def _unindex(self, job_id: int):
+        previous = self._postings.pop(job_id, None)
+        if previous is None:
+            return
+        self.relevance.remove(job_id)
+        for token in _skill_tokens(previous["required_skills"]):
+            ids = self._token_index.get(token)
+            if ids is not None:
+                ids.discard(job_id)
+                if not ids:
+                    del self._token_index[token]
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def add(self, text: str, title: str = ""):
+        return (await self.add_many([{"text": text, "title": title}]))[0]
+
+    async def add_many(self, postings):
+        """Analyze and ingest postings ({"text", "title"}) in a single transaction."""
+        return await self._run(self._add_many, postings)
+
+    async def update(self, job_id: int, text: str, title: str = ""):
+        return await self._run(self._update, job_id, text, title)
+
+    async def delete(self, job_id: int):
+        return await self._run(self._delete, job_id)
+
+    async def get(self, job_id: int):
+        return await self._run(self._get, job_id)
+
+    async def recent_texts(self, limit: int):
+        """Texts of the most recently updated postings, newest first."""
+        return await self._run(self._recent_texts, limit)
+
+    def _add_many(self, postings):
+        analyzed = [(p, get_job_analysis(p["text"])) for p in postings]
+        now = datetime.now(timezone.utc).isoformat()
+        added = []
+        with self._lock:
+            with self._conn:
+                for item, job_data in analyzed:
+                    title = item.get("title", "")
+                    cursor = self._conn.execute(
+                        """
+                        INSERT INTO job_postings (title, text, required_skills, role_title, role_family, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        """,
+                        (
+                            title or job_data["role_title"],
+                            item["text"],
+                            json.dumps(job_data["required_skills"]),
+                            job_data["role_title"],
+                            job_data["role_family"],
+                            now,
+                        ),
+                    )
+                    added.append((self._posting_from(cursor.lastrowid, title, job_data, now), item["text"]))
+            for posting, text in added:
+                self._index(posting, text)
+        return [posting for posting, _ in added]
+
+    def _update(self, job_id: int, text: str, title: str = ""):
+        job_data = get_job_analysis(text)
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                UPDATE job_postings
+                SET title = ?, text = ?, required_skills = ?, role_title = ?, role_family = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                (
+                    title or job_data["role_title"],
+                    text,
+                    json.dumps(job_data["required_skills"]),
+                    job_data["role_title"],
+                    job_data["role_family"],
+                    now,
+                    job_id,
+                ),
+            )
+            self._conn.commit()
+            if cursor.rowcount == 0:
+                return None
+            posting = self._posting_from(job_id, title, job_data, now)
+            self._index(posting, text)
+        return posting
+
+    def _delete(self, job_id: int):
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM job_postings WHERE id = ?", (job_id,))
+            self._conn.commit()
+            self._unindex(job_id)
+        return cursor.rowcount > 0
+
+    def _get(self, job_id: int):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, title, text, required_skills, role_title, role_family, updated_at FROM job_postings WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        posting = dict(row)
+        posting["required_skills"] = json.loads(posting["required_skills"])
+        return posting
+
+    def _recent_texts(self, limit: int):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT text FROM job_postings ORDER BY updated_at DESC, id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [row["text"] for row in rows]
+
+    def top_matches(self, resume_skills, k: int = 10):
+        """Best-fitting postings for a resume's skills, ranked by match score then matched-skill count."""
+        resume_index = ResumeSkillIndex(resume_skills)
+        with self._lock:
+            candidate_ids = set()
+            for token in resume_index.tokens:
+                candidate_ids.update(self._token_index.get(token, ()))
+            candidates = [self._postings[job_id] for job_id in candidate_ids]
+
+        scored = []
+        for posting in candidates:
+            required = list(dict.fromkeys(posting["required_skills"]))
+            if not required:
+                continue
+            matched = [skill for skill in required if resume_index.matches(skill)]
+            missing = [skill for skill in required if skill not in matched]
+            score = int(len(matched) / len(required) * 100)
+            scored.append((score, len(matched), -posting["id"], posting, matched, missing))
+
+        top = heapq.nlargest(max(0, k), scored, key=lambda row: row[:3])
+        results = []
+        for score, _, _, posting, matched, missing in top:
+            results.append({
+                "id": posting["id"],
+                "title": posting["title"],
+                "role_title": posting["role_title"],
+                "role_family": posting["role_family"],
+                "match_score": score,
+                "matched_skills": matched,
+                "missing_skills": missing,
+            })
+        return {"candidates_scored": len(candidates), "corpus_size": len(self._postings), "results": results}
+
+    def top_matches_by_text(self, resume_text: str, k: int = 10, mode: str = "bm25"):
+        """Best-fitting postings by TF-IDF cosine or BM25 relevance of the resume text."""
+        ranked = self.relevance.top_k(resume_text, k=k, mode=mode)
+        results = []
+        with self._lock:
+            for job_id, relevance in ranked:
+                posting = self._postings.get(job_id)
+                if posting is None:
+                    continue
+                results.append({
+                    "id": posting["id"],
+                    "title": posting["title"],
+                    "role_title": posting["role_title"],
+                    "role_family": posting["role_family"],
+                    "relevance": round(relevance, 4),
+                })
+        return {"corpus_size": len(self._postings), "results": results}
+
+    def _posting_from(self, job_id: int, title: str, job_data: dict, updated_at: str):
+        return {
+            "id": job_id,
+            "title": title or job_data["role_title"],
+            "required_skills": job_data["required_skills"],
+            "role_title": job_data["role_title"],
+            "role_family": job_data["role_family"],
+            "updated_at": updated_at,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+
+
+def _skill_tokens(skills):
+    tokens = set()
+    for skill in skills:
+        tokens.update(normalize_skill(skill).split())
+    return tokens
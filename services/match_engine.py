@@ -0,0 +1,78 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+SkillMatchResult = namedtuple("SkillMatchResult", ["matched", "missing", "score"])
+
+_ALNUM_RUN_RE = re.compile(r"[a-z0-9]+")
+
+# Resume skills longer than this are checked directly instead of being expanded into substrings.
+_MAX_INDEXED_SKILL_CHARS = 64
+
+
+@lru_cache(maxsize=8192)
+def normalize_skill(skill: str):
+    # Lowercase, turn every non-alphanumeric run into one space and trim, in one regex pass.
+    return " ".join(_ALNUM_RUN_RE.findall((skill or "").lower()))
+
+
+class ResumeSkillIndex:
+    """
+    Resume skills normalized once and indexed for constant-time match lookups.
+
+    A job skill matches when it equals a resume skill, either one contains the
+    other, or they share a token (e.g. "Corporate Law" vs "Law").
+    """
+
+    def __init__(self, resume_skills):
+        self.skills = set()
+        self.tokens = set()
+        self.substrings = set()
+        self.lengths = set()
+        self._long_skills = []
+        for skill in resume_skills:
+            normalized = normalize_skill(skill)
+            if not normalized or normalized in self.skills:
+                continue
+            self.skills.add(normalized)
+            self.lengths.add(len(normalized))
+            self.tokens.update(normalized.split())
+            if len(normalized) > _MAX_INDEXED_SKILL_CHARS:
+                self._long_skills.append(normalized)
+                continue
+            for start in range(len(normalized)):
+                for end in range(start + 1, len(normalized) + 1):
+                    self.substrings.add(normalized[start:end])
+
+    def matches(self, job_skill: str):
+        normalized = normalize_skill(job_skill)
+        if not normalized or not self.skills:
+            return False
+        # Shared token, or the job skill sits inside a resume skill.
+        if not self.tokens.isdisjoint(normalized.split()) or normalized in self.substrings:
+            return True
+        if any(normalized in skill for skill in self._long_skills):
+            return True
+        # A resume skill sits inside the job skill.
+        for length in self.lengths:
+            for start in range(len(normalized) - length + 1):
+                if normalized[start:start + length] in self.skills:
+                    return True
+        return False
+
+
+def match_skills(resume_skills, job_skills):
+    """Resolve matched skills, missing skills and the match score in a single pass."""
+    job_skills = list(dict.fromkeys(job_skills))
+    if not job_skills:
+        return SkillMatchResult([], [], 0)
+
+    index = ResumeSkillIndex(resume_skills)
+    matched = []
+    missing = []
+    for skill in job_skills:
+        if index.matches(skill):
+            matched.append(skill)
+        else:
+            missing.append(skill)
+    return SkillMatchResult(matched, missing, int(len(matched) / len(job_skills) * 100))
@@ -0,0 +1,289 @@
+import hmac
+import heapq
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+OTP_STORE_BACKENDS = ("memory", "sqlite")
+
+# verify() outcomes
+OTP_OK = "ok"
+OTP_MISSING = "missing"
+OTP_EXPIRED = "expired"
+OTP_INVALID = "invalid"
+OTP_LOCKED = "locked"
+
+# Expired codes are kept this long so verify() can still answer OTP_EXPIRED
+# instead of OTP_MISSING; after that they are purged.
+EXPIRED_CODE_RETENTION_SECONDS = 3600.0
+
+
+class OTPStore(ABC):
+    """
+    Storage for one-time login codes and the rate-limit counters guarding them.
+
+    `verify` consumes a code atomically on success, so a code can be used once even
+    when several workers share the store. With `max_attempts`, the wrong guess that
+    reaches that many failures deletes the code and returns OTP_LOCKED. `hit` is a fixed-window counter: it
+    records one event for `key` and returns 0 while the key is within `limit`
+    events per `window_seconds`, otherwise the seconds until the window resets.
+    """
+
+    @abstractmethod
+    def issue(self, email: str, code: str, ttl_seconds: float):
+        ...
+
+    @abstractmethod
+    def verify(self, email: str, code: str, max_attempts: int = None) -> str:
+        ...
+
+    @abstractmethod
+    def hit(self, key: str, limit: int, window_seconds: float) -> int:
+        ...
+
+    def close(self):
+        pass
+
+
+class _ExpiringMap:
+    """
+    Dict whose entries expire, swept through a min-heap of eviction times and capped in size.
+
+    An entry is evicted `retention_seconds` after it expires; until then `get`
+    still returns it with its expiry time, so callers can tell expired from absent.
+    """
+
+    def __init__(self, max_entries: int, retention_seconds: float = 0.0):
+        self.max_entries = max(1, max_entries)
+        self.retention_seconds = retention_seconds
+        self._items = {}
+        self._heap = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, now: float):
+        """(value, expires_at) for `key`, or None once it has been evicted."""
+        self.sweep(now)
+        item = self._items.get(key)
+        return None if item is None else (item[0], item[1])
+
+    def set(self, key, value, expires_at: float, now: float):
+        self.sweep(now)
+        if key not in self._items:
+            while len(self._items) >= self.max_entries:
+                self._evict_soonest()
+        evict_at = expires_at + self.retention_seconds
+        self._items[key] = (value, expires_at, evict_at)
+        heapq.heappush(self._heap, (evict_at, key))
+        # Re-issued keys leave stale heap entries behind; rebuild before they dominate.
+        if len(self._heap) > 2 * len(self._items) + 64:
+            self._heap = [(evict_at, key) for key, (_, _, evict_at) in self._items.items()]
+            heapq.heapify(self._heap)
+
+    def pop(self, key):
+        item = self._items.pop(key, None)
+        return None if item is None else item[0]
+
+    def sweep(self, now: float):
+        while self._heap and self._heap[0][0] <= now:
+            self._discard(*heapq.heappop(self._heap))
+
+    def _evict_soonest(self):
+        while self._heap:
+            if self._discard(*heapq.heappop(self._heap)):
+                return
+        self._items.clear()
+
+    def _discard(self, evict_at, key):
+        item = self._items.get(key)
+        # Skip heap entries that belong to an older value of a re-issued key.
+        if item is not None and item[2] == evict_at:
+            del self._items[key]
+            return True
+        return False
+
+
+class MemoryOTPStore(OTPStore):
+    """
+    Process-local OTP store.
+
+    Expired codes (after EXPIRED_CODE_RETENTION_SECONDS) and rate-limit windows
+    are dropped by a min-heap sweep on every call, and each map holds at most `max_entries` keys (the soonest-expiring one
+    is evicted first), so memory stays bounded under request floods. Codes are
+    not shared between worker processes; use SQLiteOTPStore for that.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self._codes = _ExpiringMap(max_entries, retention_seconds=EXPIRED_CODE_RETENTION_SECONDS)
+        self._windows = _ExpiringMap(max_entries)
+        self._lock = threading.Lock()
+
+    def issue(self, email: str, code: str, ttl_seconds: float):
+        now = time.time()
+        with self._lock:
+            # [code, failed attempts]
+            self._codes.set(email, [code, 0], now + ttl_seconds, now)
+
+    def verify(self, email: str, code: str, max_attempts: int = None) -> str:
+        now = time.time()
+        with self._lock:
+            item = self._codes.get(email, now)
+            if item is None:
+                return OTP_MISSING
+            entry, expires_at = item
+            if expires_at <= now:
+                self._codes.pop(email)
+                return OTP_EXPIRED
+            if not hmac.compare_digest(entry[0], code):
+                entry[1] += 1
+                if max_attempts is not None and entry[1] >= max_attempts:
+                    self._codes.pop(email)
+                    return OTP_LOCKED
+                return OTP_INVALID
+            self._codes.pop(email)
+        return OTP_OK
+
+    def hit(self, key: str, limit: int, window_seconds: float) -> int:
+        now = time.time()
+        with self._lock:
+            item = self._windows.get(key, now)
+            window = None if item is None else item[0]
+            if window is None:
+                window = [now + window_seconds, 0]
+                self._windows.set(key, window, window[0], now)
+            window[1] += 1
+            if window[1] > limit:
+                return max(1, math.ceil(window[0] - now))
+        return 0
+
+
+class SQLiteOTPStore(OTPStore):
+    """
+    OTP store in a SQLite file shared by every worker and process on the host.
+
+    Each operation is one short IMMEDIATE transaction, so issue/verify/hit are
+    atomic across processes. Expired rows are purged at most every
+    `purge_interval_seconds` using the expiry indexes; codes are kept for
+    EXPIRED_CODE_RETENTION_SECONDS past expiry so verify() reports them as expired.
+    """
+
+    def __init__(self, db_path: str, purge_interval_seconds: float = 60.0):
+        self.db_path = db_path
+        self.purge_interval_seconds = purge_interval_seconds
+        self._next_purge = 0.0
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=5.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS otp_codes (
+                email TEXT PRIMARY KEY,
+                code TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                failures INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(otp_codes)")}
+        if "failures" not in columns:
+            # Databases created before attempt counting.
+            self._conn.execute("ALTER TABLE otp_codes ADD COLUMN failures INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_otp_codes_expires ON otp_codes (expires_at)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS otp_rate_windows (
+                key TEXT PRIMARY KEY,
+                window_end REAL NOT NULL,
+                count INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_otp_rate_windows_end ON otp_rate_windows (window_end)")
+
+    def _transaction(self, fn, *args):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(*args)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def _maybe_purge(self, now: float):
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self.purge_interval_seconds
+        self._conn.execute("DELETE FROM otp_codes WHERE expires_at <= ?", (now - EXPIRED_CODE_RETENTION_SECONDS,))
+        self._conn.execute("DELETE FROM otp_rate_windows WHERE window_end <= ?", (now,))
+
+    def issue(self, email: str, code: str, ttl_seconds: float):
+        def _issue(now):
+            self._maybe_purge(now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO otp_codes (email, code, expires_at, failures) VALUES (?, ?, ?, 0)",
+                (email, code, now + ttl_seconds),
+            )
+
+        self._transaction(_issue, time.time())
+
+    def verify(self, email: str, code: str, max_attempts: int = None) -> str:
+        def _verify(now):
+            row = self._conn.execute(
+                "SELECT code, expires_at, failures FROM otp_codes WHERE email = ?", (email,)
+            ).fetchone()
+            if row is None:
+                return OTP_MISSING
+            expected, expires_at, failures = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM otp_codes WHERE email = ?", (email,))
+                return OTP_EXPIRED
+            if not hmac.compare_digest(expected, code):
+                if max_attempts is not None and failures + 1 >= max_attempts:
+                    self._conn.execute("DELETE FROM otp_codes WHERE email = ?", (email,))
+                    return OTP_LOCKED
+                self._conn.execute("UPDATE otp_codes SET failures = failures + 1 WHERE email = ?", (email,))
+                return OTP_INVALID
+            self._conn.execute("DELETE FROM otp_codes WHERE email = ?", (email,))
+            return OTP_OK
+
+        return self._transaction(_verify, time.time())
+
+    def hit(self, key: str, limit: int, window_seconds: float) -> int:
+        def _hit(now):
+            window_end, count = self._conn.execute(
+                """
+                INSERT INTO otp_rate_windows (key, window_end, count) VALUES (?, ?, 1)
+                ON CONFLICT (key) DO UPDATE SET
+                    window_end = CASE WHEN window_end <= excluded.window_end - ? THEN excluded.window_end ELSE window_end END,
+                    count = CASE WHEN window_end <= excluded.window_end - ? THEN 1 ELSE count + 1 END
+                RETURNING window_end, count
+                """,
+                (key, now + window_seconds, window_seconds, window_seconds),
+            ).fetchone()
+            if count > limit:
+                return max(1, math.ceil(window_end - now))
+            return 0
+
+        return self._transaction(_hit, time.time())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_otp_store(backend: str, db_path: str = "", max_entries: int = 10000) -> OTPStore:
+    if backend == "sqlite":
+        return SQLiteOTPStore(db_path)
+    if backend == "memory":
+        return MemoryOTPStore(max_entries=max_entries)
+    raise ValueError(f"OTP store backend must be one of: {', '.join(OTP_STORE_BACKENDS)}.")
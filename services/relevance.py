@@ -0,0 +1,215 @@
+import threading
+from collections import namedtuple
+
+import numpy as np
+from scipy import sparse
+
+from utils.tokenizer import STOPWORDS, TokenizedDocument, tokenize_document
+
+MATCH_MODES = ("skills", "tfidf", "bm25")
+
+# `tfidf` and `bm25` are stored term-major (terms x docs).
+_Snapshot = namedtuple(
+    "_Snapshot",
+    ["doc_ids", "n_docs", "df", "avgdl", "tfidf_idf", "bm25_idf", "tfidf", "bm25"],
+)
+
+
+class RelevanceIndex:
+    """
+    Sparse TF-IDF / BM25 scoring over a corpus of job descriptions.
+
+    Documents are stored as compact (term id, count) arrays. Document
+    frequencies and total length are kept up to date on every add/remove, so
+    `pair_score` never waits on a rebuild; the weighted document-term matrices
+    used by `score`/`top_k` are rebuilt lazily on the first corpus query after
+    a change. Queries are scored against every document with a
+    single sparse matrix product, so one resume vs. the whole corpus (or many
+    resumes at once via `score_many`) is a batched operation, not a Python loop.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._vocab = {}
+        self._docs = {}
+        self._df = {}
+        self._total_len = 0.0
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, doc_id, text: str):
+        # Corpus documents bypass the shared tokenization cache so ingest does not evict request texts.
+        counts = TokenizedDocument(text, STOPWORDS).counts
+        with self._lock:
+            term_ids = np.fromiter(
+                (self._vocab.setdefault(term, len(self._vocab)) for term in counts),
+                dtype=np.int64,
+                count=len(counts),
+            )
+            previous = self._docs.get(doc_id)
+            if previous is not None:
+                self._uncount(previous)
+            doc = (term_ids, np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+            self._docs[doc_id] = doc
+            df = self._df
+            for term_id in term_ids.tolist():
+                df[term_id] = df.get(term_id, 0) + 1
+            self._total_len += float(doc[1].sum())
+            self._snapshot = None
+
+    def remove(self, doc_id):
+        with self._lock:
+            doc = self._docs.pop(doc_id, None)
+            if doc is not None:
+                self._uncount(doc)
+                self._snapshot = None
+
+    def _uncount(self, doc):
+        df = self._df
+        for term_id in doc[0].tolist():
+            if df[term_id] == 1:
+                del df[term_id]
+            else:
+                df[term_id] -= 1
+        self._total_len -= float(doc[1].sum())
+
+    def score(self, text: str, mode: str = "bm25"):
+        """Scores of `text` against every document: (doc_ids, 1-D array)."""
+        doc_ids, scores = self.score_many([text], mode)
+        return doc_ids, scores[0]
+
+    def score_many(self, texts, mode: str = "bm25"):
+        """Scores of each text against every document: (doc_ids, len(texts) x n_docs array)."""
+        snapshot = self._get_snapshot()
+        if not snapshot.n_docs or not texts:
+            return snapshot.doc_ids, np.zeros((len(texts), snapshot.n_docs))
+        queries = self._query_matrix(texts, snapshot, mode)
+        # Term-major matrices: the product only touches the rows of terms present in the queries.
+        matrix = snapshot.bm25 if mode == "bm25" else snapshot.tfidf
+        scores = (queries @ matrix).toarray()
+        return snapshot.doc_ids, scores
+
+    def top_k(self, text: str, k: int = 10, mode: str = "bm25"):
+        doc_ids, scores = self.score(text, mode)
+        if not len(doc_ids) or k <= 0:
+            return []
+        k = min(k, len(doc_ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((top, -scores[top]))]
+        return [(doc_ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+    def pair_score(self, resume_text: str, job_text: str, mode: str = "bm25"):
+        """
+        0..100 relevance of a resume to one job description, using corpus IDF.
+
+        tfidf: cosine similarity of the two TF-IDF vectors.
+        bm25: BM25 of the JD terms against the resume, relative to the JD scored against itself.
+        """
+        resume_counts = tokenize_document(resume_text or "").counts
+        job_counts = tokenize_document(job_text or "").counts
+        if not resume_counts or not job_counts:
+            return 0
+
+        terms = list(set(resume_counts) | set(job_counts))
+        with self._lock:
+            corpus_docs = len(self._docs)
+            corpus_avgdl = (self._total_len / corpus_docs or 1.0) if corpus_docs else 0.0
+            corpus_df = [self._df.get(self._vocab.get(term), 0) for term in terms]
+
+        # The JD joins the corpus statistics so its own terms always get a defined IDF.
+        n_docs = corpus_docs + 1
+        df = np.array([count + (1 if term in job_counts else 0) for term, count in zip(terms, corpus_df)], dtype=np.float64)
+        resume_tf = np.array([resume_counts.get(term, 0) for term in terms], dtype=np.float64)
+        job_tf = np.array([job_counts.get(term, 0) for term in terms], dtype=np.float64)
+
+        if mode == "tfidf":
+            idf = np.log((1 + n_docs) / (1 + df)) + 1
+            resume_vec = _sublinear(resume_tf) * idf
+            job_vec = _sublinear(job_tf) * idf
+            denom = np.linalg.norm(resume_vec) * np.linalg.norm(job_vec)
+            return int(round(100 * float(resume_vec @ job_vec) / denom)) if denom else 0
+
+        idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        job_len = job_tf.sum()
+        avgdl = (corpus_avgdl * corpus_docs + job_len) / n_docs
+        query = (job_tf > 0).astype(np.float64)
+        achieved = query @ self._bm25_weights(resume_tf, resume_tf.sum(), avgdl, idf)
+        reference = query @ self._bm25_weights(job_tf, job_len, avgdl, idf)
+        return int(round(min(100.0, 100 * achieved / reference))) if reference > 0 else 0
+
+    def _bm25_weights(self, tf, doc_len, avgdl, idf):
+        norm = self.k1 * (1 - self.b + self.b * doc_len / (avgdl or 1))
+        return idf * tf * (self.k1 + 1) / (tf + norm)
+
+    def _query_matrix(self, texts, snapshot: _Snapshot, mode: str):
+        rows, cols, values = [], [], []
+        n_terms = len(snapshot.df)
+        for row, text in enumerate(texts):
+            counts = tokenize_document(text or "").counts
+            term_ids, tf = [], []
+            for term, count in counts.items():
+                term_id = self._vocab.get(term)
+                if term_id is not None and term_id < n_terms:
+                    term_ids.append(term_id)
+                    tf.append(count)
+            if not term_ids:
+                continue
+            term_ids = np.array(term_ids)
+            if mode == "bm25":
+                weights = np.ones(len(term_ids))
+            else:
+                weights = _sublinear(np.array(tf, dtype=np.float64)) * snapshot.tfidf_idf[term_ids]
+                weights /= np.linalg.norm(weights) or 1
+            rows.extend([row] * len(term_ids))
+            cols.extend(term_ids.tolist())
+            values.extend(weights.tolist())
+        return sparse.csr_matrix((values, (rows, cols)), shape=(len(texts), n_terms))
+
+    def _get_snapshot(self):
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._build()
+            return self._snapshot
+
+    def _build(self):
+        doc_ids = list(self._docs)
+        n_docs = len(doc_ids)
+        n_terms = len(self._vocab)
+        if not n_docs:
+            empty = sparse.csr_matrix((n_terms, 0))
+            return _Snapshot([], 0, np.zeros(n_terms), 0.0, np.zeros(n_terms), np.zeros(n_terms), empty, empty)
+
+        lengths = np.array([len(self._docs[d][0]) for d in doc_ids])
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        indices = np.concatenate([self._docs[d][0] for d in doc_ids])
+        tf = np.concatenate([self._docs[d][1] for d in doc_ids])
+        counts = sparse.csr_matrix((tf, indices, indptr), shape=(n_docs, n_terms))
+
+        df = np.bincount(indices, minlength=n_terms).astype(np.float64)
+        doc_len = np.asarray(counts.sum(axis=1)).ravel()
+        avgdl = float(doc_len.mean()) or 1.0
+        tfidf_idf = np.log((1 + n_docs) / (1 + df)) + 1
+        bm25_idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+        tfidf = counts.copy()
+        tfidf.data = _sublinear(tfidf.data) * tfidf_idf[tfidf.indices]
+        norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        tfidf = sparse.diags(1 / norms) @ tfidf
+
+        bm25 = counts.copy()
+        row_len = np.repeat(doc_len, lengths)
+        bm25.data = self._bm25_weights(bm25.data, row_len, avgdl, bm25_idf[bm25.indices])
+
+        return _Snapshot(doc_ids, n_docs, df, avgdl, tfidf_idf, bm25_idf, tfidf.T.tocsr(), bm25.T.tocsr())
+
+
+def _sublinear(tf):
+    out = np.zeros_like(tf, dtype=np.float64)
+    positive = tf > 0
+    out[positive] = 1 + np.log(tf[positive])
+    return out
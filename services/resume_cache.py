@@ -0,0 +1,59 @@
+from utils.cache import LRUCache, SQLiteCacheTier
+
+RESUME_CACHE_KINDS = ("text", "analysis", "links")
+
+
+class ResumeCache:
+    """
+    Content-addressed cache for everything derived from an uploaded resume PDF.
+
+    Entries are keyed by the SHA-256 of the PDF bytes (callers add whatever else
+    shapes the value, such as extraction limits), one namespace per kind:
+    `text` (extracted text), `analysis` (analyze_resume output) and `links`
+    (extract_profile_links output). The in-memory tier is LRU + TTL with a byte cap;
+    when `db_path` is set, a SQLite tier keeps entries across restarts, capped at
+    `db_max_entries` rows and `db_max_bytes` of JSON.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 86400,
+        max_bytes: int = 64 * 1024 * 1024,
+        db_path: str = "",
+        db_max_entries: int = 10000,
+        db_max_bytes: int = 256 * 1024 * 1024,
+    ):
+        # The byte budget is shared evenly by the kinds so large texts cannot evict every analysis.
+        per_kind_bytes = max(1, max_bytes // len(RESUME_CACHE_KINDS))
+        self._memory = {
+            kind: LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds, max_bytes=per_kind_bytes)
+            for kind in RESUME_CACHE_KINDS
+        }
+        self._persistent = (
+            SQLiteCacheTier(db_path, ttl_seconds=ttl_seconds, max_entries=db_max_entries, max_bytes=db_max_bytes)
+            if db_path
+            else None
+        )
+
+    def get(self, kind: str, digest: str):
+        value = self._memory[kind].get(digest)
+        if value is not None:
+            return value
+        if self._persistent is not None:
+            value = self._persistent.get(kind, digest)
+            if value is not None:
+                self._memory[kind].set(digest, value)
+        return value
+
+    def set(self, kind: str, digest: str, value):
+        self._memory[kind].set(digest, value)
+        if self._persistent is not None:
+            self._persistent.set(kind, digest, value)
+
+    def stats(self):
+        return {kind: cache.stats() for kind, cache in self._memory.items()}
+
+    def close(self):
+        if self._persistent is not None:
+            self._persistent.close()
@@ -0,0 +1,76 @@
+import re
+from collections import namedtuple
+
+# Word tokens as skills are written: keeps "c++", "c#", "node.js" and "web3" whole,
+# while a trailing sentence period ("python.") is not part of the token.
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*", re.IGNORECASE | re.ASCII)
+_TERMINAL = object()
+
+SkillHit = namedtuple("SkillHit", ["skill", "start", "end"])
+
+
+def skill_tokens(text: str):
+    return tuple(m.group().lower() for m in _WORD_RE.finditer(text or ""))
+
+
+class SkillMatcher:
+    """
+    Precompiled multi-skill matcher with word-boundary semantics.
+
+    Skills are compiled into a token trie, so a document is scanned once and the
+    work per token is bounded by the longest skill phrase, not the vocabulary size.
+    """
+
+    def __init__(self, skills=()):
+        self.rebuild(skills)
+
+    def rebuild(self, skills):
+        """Compile a new vocabulary; readers keep using the old one until the swap."""
+        ordered = []
+        trie = {}
+        max_words = 0
+        for skill in skills:
+            words = skill_tokens(skill)
+            if not words:
+                continue
+            node = trie
+            for word in words:
+                node = node.setdefault(word, {})
+            if _TERMINAL in node:
+                continue
+            node[_TERMINAL] = (len(ordered), skill)
+            ordered.append(skill)
+            max_words = max(max_words, len(words))
+        self._compiled = (tuple(ordered), trie, max_words)
+
+    @property
+    def skills(self):
+        return self._compiled[0]
+
+    def scan(self, text: str):
+        """Return every skill occurrence as SkillHit(skill, start, end), in text order."""
+        return [SkillHit(skill, start, end) for _, skill, start, end in self._iter_hits(text)]
+
+    def find(self, text: str):
+        """Distinct skills present in `text`, in vocabulary order."""
+        found = {}
+        for order, skill, _, _ in self._iter_hits(text):
+            found.setdefault(order, skill)
+        return [found[order] for order in sorted(found)]
+
+    def _iter_hits(self, text: str):
+        _, trie, max_words = self._compiled
+        if not trie or not text:
+            return
+        words = [(m.group().lower(), m.start(), m.end()) for m in _WORD_RE.finditer(text)]
+        for i, (word, start, _) in enumerate(words):
+            node = trie.get(word)
+            j = i
+            while node is not None:
+                terminal = node.get(_TERMINAL)
+                if terminal is not None:
+                    yield terminal[0], terminal[1], start, words[j][2]
+                j += 1
+                if j >= len(words) or j - i >= max_words:
+                    break
+                node = node.get(words[j][0])
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from services.skill_matcher import SkillMatcher
+
+DEFAULT_TAXONOMY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "skill_taxonomy.json"
+)
+
+
+class Taxonomy:
+    """
+    Immutable, compiled snapshot of the skill vocabulary.
+
+    Built from the taxonomy file: skills, skill categories, keyword aliases, role
+    skill templates, skill hint sets and generic non-skill words. Lookups that scan
+    text go through precompiled matchers so they stay O(text) as the file grows.
+    """
+
+    def __init__(self, data: dict, revision: str = ""):
+        self.version = data.get("version", 0)
+        self.revision = revision or str(self.version)
+        self.skills = tuple(data.get("skills", []))
+        # Alias tables are scoped by the extractor that uses them, e.g. "general_keywords".
+        self.aliases = {
+            scope: {k.lower(): v for k, v in table.items()} for scope, table in data.get("aliases", {}).items()
+        }
+        self.role_templates = {k.lower(): list(v) for k, v in data.get("role_templates", {}).items()}
+        self.skill_hints = {k.lower(): frozenset(h.lower() for h in v) for k, v in data.get("skill_hints", {}).items()}
+        self.generic_non_skills = frozenset(w.lower() for w in data.get("generic_non_skills", []))
+        self.categories = {name: tuple(skills) for name, skills in data.get("categories", {}).items()}
+
+        self.skill_category = {}
+        for name, skills in self.categories.items():
+            for skill in skills:
+                self.skill_category.setdefault(skill.lower(), name)
+
+        self.skill_matcher = SkillMatcher(self.skills)
+        self.categorized_skill_matcher = SkillMatcher(
+            skill for skills in self.categories.values() for skill in skills
+        )
+        self._role_template_matcher = SkillMatcher(self.role_templates)
+
+    def role_template_skills(self, text: str):
+        """Skills of the first role template (in file order) whose role phrase appears in `text`."""
+        matched_roles = self._role_template_matcher.find(text)
+        if not matched_roles:
+            return []
+        return self.role_templates[matched_roles[0]]
+
+    def alias(self, scope: str, token: str, default: str):
+        return self.aliases.get(scope, {}).get(token, default)
+
+    def summary(self):
+        return {
+            "version": self.version,
+            "revision": self.revision,
+            "skills": len(self.skills),
+            "aliases": {scope: len(table) for scope, table in self.aliases.items()},
+            "role_templates": len(self.role_templates),
+            "skill_hints": len(self.skill_hints),
+        }
+
+
+def load_taxonomy(path: str) -> Taxonomy:
+    with open(path, "rb") as taxonomy_file:
+        raw = taxonomy_file.read()
+    data = json.loads(raw.decode("utf-8"))
+    revision = f"{data.get('version', 0)}-{hashlib.sha256(raw).hexdigest()[:12]}"
+    return Taxonomy(data, revision=revision)
+
+
+class TaxonomyStore:
+    """
+    Serves the current Taxonomy and hot-reloads it when the file changes.
+
+    The file's mtime is checked at most every `check_interval_seconds`. A reload
+    compiles a complete new snapshot before swapping it in, so readers always see
+    either the old or the new taxonomy, never a mix. A file that fails to parse
+    leaves the previous snapshot in place and is reported in `last_error`.
+    """
+
+    def __init__(self, path: str, check_interval_seconds: float = 5.0):
+        self.path = path
+        self.check_interval_seconds = check_interval_seconds
+        self.last_error = ""
+        self._lock = threading.Lock()
+        self._mtime = self._read_mtime()
+        self._current = load_taxonomy(path)
+        self._next_check = time.monotonic() + check_interval_seconds
+
+    def current(self) -> Taxonomy:
+        if time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        return self._current
+
+    def reload(self) -> Taxonomy:
+        with self._lock:
+            self._reload_locked()
+        return self._current
+
+    def _maybe_reload(self):
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = time.monotonic() + self.check_interval_seconds
+            if self._read_mtime() != self._mtime:
+                self._reload_locked()
+        finally:
+            self._lock.release()
+
+    def _reload_locked(self):
+        mtime = self._read_mtime()
+        try:
+            taxonomy = load_taxonomy(self.path)
+        except (OSError, ValueError) as exc:
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            self._mtime = mtime
+            return
+        self.last_error = ""
+        self._mtime = mtime
+        self._current = taxonomy
+
+    def _read_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_taxonomy_store() -> TaxonomyStore:
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = TaxonomyStore(
+                    os.getenv("SKILL_TAXONOMY_PATH", "").strip() or DEFAULT_TAXONOMY_PATH,
+                    check_interval_seconds=float(os.getenv("SKILL_TAXONOMY_CHECK_SECONDS", "5")),
+                )
+    return _STORE
+
+
+def get_taxonomy() -> Taxonomy:
+    return get_taxonomy_store().current()
@@ -0,0 +1,34 @@
+from starlette.requests import Request
+
+from utils.client_ip import client_ip
+
+
+def make_request(peer="10.0.0.1", forwarded=None):
+    headers = []
+    if forwarded is not None:
+        headers.append((b"x-forwarded-for", forwarded.encode()))
+    return Request({"type": "http", "headers": headers, "client": (peer, 12345)})
+
+
+def test_direct_connection_uses_peer_address():
+    assert client_ip(make_request(), trusted_proxy_hops=0) == "10.0.0.1"
+
+
+def test_forwarded_header_ignored_without_trusted_proxies():
+    # A client can send any X-Forwarded-For; it must not pick its own rate-limit bucket.
+    assert client_ip(make_request(forwarded="1.2.3.4"), trusted_proxy_hops=0) == "10.0.0.1"
+
+
+def test_behind_one_proxy_uses_rightmost_forwarded_entry():
+    request = make_request(forwarded="6.6.6.6, 203.0.113.7")
+    assert client_ip(request, trusted_proxy_hops=1) == "203.0.113.7"
+
+
+def test_behind_two_proxies_skips_the_inner_proxy():
+    request = make_request(forwarded="6.6.6.6, 203.0.113.7, 10.1.1.1")
+    assert client_ip(request, trusted_proxy_hops=2) == "203.0.113.7"
+
+
+def test_missing_forwarded_header_falls_back_to_peer():
+    assert client_ip(make_request(), trusted_proxy_hops=1) == "10.0.0.1"
+    assert client_ip(make_request(forwarded="203.0.113.7"), trusted_proxy_hops=2) == "10.0.0.1"
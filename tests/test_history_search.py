@@ -0,0 +1,69 @@
+import asyncio
+import sqlite3
+import time
+
+from services.history_store import MIGRATIONS, HistoryStore
+
+
+def _item(title, summary="summary", job="job description"):
+    return {"mode": "match", "title": title, "summary": summary, "job": job}
+
+
+def _search(store, client_id, text):
+    return asyncio.run(store.search(client_id, text))
+
+
+def _add(store, client_id, item):
+    return asyncio.run(store.add(client_id, item))
+
+
+def test_highlighted_fields_are_html_escaped(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    try:
+        _add(store, "alice", _item("Python <script>alert(1)</script>", summary="<b>python</b> & more"))
+        [row] = _search(store, "alice", "python")["results"]
+        assert row["title"] == "<mark>Python</mark> &lt;script&gt;alert(1)&lt;/script&gt;"
+        assert row["summary"] == "&lt;b&gt;<mark>python</mark>&lt;/b&gt; &amp; more"
+    finally:
+        store.close()
+
+
+def test_search_only_returns_the_callers_rows(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    try:
+        _add(store, "alice", _item("Python engineer"))
+        _add(store, "alice-2", _item("Python developer"))
+        _add(store, "bob", _item("Python analyst"))
+        assert [r["title"] for r in _search(store, "alice", "python")["results"]] == ["<mark>Python</mark> engineer"]
+        # The client token is not searchable as text.
+        bob_key = "bob".encode().hex()
+        assert _search(store, "bob", bob_key)["results"] == []
+    finally:
+        store.close()
+
+
+def test_version_3_index_is_rebuilt_with_client_tokens(tmp_path):
+    path = str(tmp_path / "history.db")
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    for migration in MIGRATIONS[:3]:
+        migration(conn)
+    conn.executemany(
+        "INSERT INTO search_history (client_id, mode, title, summary, job, created_at) VALUES (?, 'm', ?, 's', 'j', '2025-01-01')",
+        [("alice" if i % 2 else "bob", f"Backend engineer {i}") for i in range(50)],
+    )
+    conn.execute("PRAGMA user_version = 3")
+    conn.commit()
+    conn.close()
+
+    store = HistoryStore(path, fts_backfill_chunk=7)
+    try:
+        assert store.schema_version == len(MIGRATIONS)
+        deadline = time.monotonic() + 5
+        while _search(store, "alice", "backend")["backfill_pending"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        result = asyncio.run(store.search("alice", "backend", limit=100))
+        assert not result["backfill_pending"]
+        assert len(result["results"]) == 25
+    finally:
+        store.close()
@@ -0,0 +1,179 @@
+import base64
+import socketserver
+import threading
+import time
+from email.message import EmailMessage
+
+from utils.mailer import SMTPMailer
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Minimal local SMTP server: records connections, logins and delivered messages.
+
+    `refuse_connections` greets that many connections with 421 before accepting
+    mail, and `stall_seconds` delays every DATA reply to mimic a slow server.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, advertise_auth=True, refuse_connections=0, stall_seconds=0.0):
+        super().__init__(("127.0.0.1", 0), _StubSMTPHandler)
+        self.advertise_auth = advertise_auth
+        self.refuse_connections = refuse_connections
+        self.stall_seconds = stall_seconds
+        self.connections = 0
+        self.logins = []
+        self.messages = []
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+class _StubSMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        if server.connections <= server.refuse_connections:
+            self.reply("421 stub busy")
+            return
+        self.reply("220 stub ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.reply("250-stub" if server.advertise_auth else "250 stub")
+                if server.advertise_auth:
+                    self.reply("250 AUTH PLAIN")
+            elif verb == "AUTH":
+                credentials = base64.b64decode(command.split()[2]).split(b"\0")
+                server.logins.append((credentials[1].decode(), credentials[2].decode()))
+                self.reply("235 accepted")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self.reply("250 ok")
+            elif verb == "DATA":
+                self.reply("354 go ahead")
+                body = []
+                while (data := self.rfile.readline()) not in (b".\r\n", b""):
+                    body.append(data)
+                time.sleep(server.stall_seconds)
+                server.messages.append(b"".join(body))
+                self.reply("250 queued")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 unsupported")
+
+
+def make_message(to="candidate@example.com"):
+    message = EmailMessage()
+    message["From"] = "noreply@example.com"
+    message["To"] = to
+    message["Subject"] = "Your code"
+    message.set_content("123456")
+    return message
+
+
+def mailer_for(server, **kwargs):
+    kwargs.setdefault("user", "apikey")
+    kwargs.setdefault("password", "secret")
+    return SMTPMailer("127.0.0.1", server.port, use_starttls=False, timeout_seconds=5.0, **kwargs)
+
+
+def test_sends_with_login():
+    with StubSMTPServer() as server:
+        mailer = mailer_for(server)
+        mailer.send(make_message())
+        mailer.close()
+    assert mailer.stats()["sent"] == 1
+    assert server.logins == [("apikey", "secret")]
+    assert b"123456" in server.messages[0]
+
+
+def test_burst_is_delivered_over_one_connection():
+    with StubSMTPServer() as server:
+        mailer = mailer_for(server)
+        for i in range(5):
+            mailer.send(make_message(to=f"user{i}@example.com"))
+        mailer.close()
+    assert mailer.stats()["sent"] == 5
+    assert len(server.messages) == 5
+    assert server.connections == 1
+    assert len(server.logins) == 1
+
+
+def test_failed_connections_are_retried_with_backoff():
+    with StubSMTPServer(refuse_connections=2) as server:
+        mailer = mailer_for(server, max_retries=3, backoff_seconds=0.1)
+        started = time.monotonic()
+        mailer.send(make_message())
+        mailer.close()
+        elapsed = time.monotonic() - started
+    assert mailer.stats()["sent"] == 1
+    assert server.connections == 3
+    # Backoff doubles: 0.1 s after the first refusal, 0.2 s after the second.
+    assert elapsed >= 0.3
+
+
+def test_gives_up_after_max_retries():
+    with StubSMTPServer(refuse_connections=10) as server:
+        mailer = mailer_for(server, max_retries=1, backoff_seconds=0.01)
+        mailer.send(make_message())
+        mailer.close()
+    stats = mailer.stats()
+    assert (stats["sent"], stats["failed"]) == (0, 1)
+    assert server.connections == 2
+    assert "SMTPConnectError" in stats["last_error"]
+
+
+def test_refuses_to_send_unauthenticated_when_credentials_are_set():
+    with StubSMTPServer(advertise_auth=False) as server:
+        mailer = mailer_for(server, max_retries=0)
+        mailer.send(make_message())
+        mailer.close()
+    stats = mailer.stats()
+    assert (stats["sent"], stats["failed"]) == (0, 1)
+    assert "SMTPNotSupportedError" in stats["last_error"]
+    assert server.messages == []
+
+
+def test_sends_without_login_when_no_credentials_are_set():
+    with StubSMTPServer(advertise_auth=False) as server:
+        mailer = mailer_for(server, user="", password="")
+        mailer.send(make_message())
+        mailer.close()
+    assert mailer.stats()["sent"] == 1
+    assert server.logins == []
+
+
+def test_close_is_bounded_by_its_timeout_against_a_stalled_server():
+    with StubSMTPServer(stall_seconds=3.0) as server:
+        mailer = mailer_for(server, max_queue=2, batch_size=1, max_retries=0)
+        mailer.send(make_message())
+        deadline = time.monotonic() + 2
+        while server.connections == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # The worker is stuck in DATA; fill the queue so the stop marker has no room.
+        mailer.send(make_message())
+        mailer.send(make_message())
+        started = time.monotonic()
+        mailer.close(timeout_seconds=0.5)
+        assert time.monotonic() - started < 1.0
@@ -0,0 +1,79 @@
+import pytest
+
+from services import otp_store
+from services.otp_store import OTP_EXPIRED, OTP_INVALID, OTP_LOCKED, OTP_MISSING, OTP_OK, MemoryOTPStore, OTPStore, SQLiteOTPStore
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(otp_store.time, "time", fake)
+    return fake
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path, clock):
+    if request.param == "memory":
+        store = MemoryOTPStore(max_entries=100)
+    else:
+        store = SQLiteOTPStore(str(tmp_path / "otp.db"))
+    yield store
+    store.close()
+
+
+def test_verify_consumes_code(store):
+    store.issue("a@example.com", "123456", 600)
+    assert store.verify("a@example.com", "000000") == OTP_INVALID
+    assert store.verify("a@example.com", "123456") == OTP_OK
+    assert store.verify("a@example.com", "123456") == OTP_MISSING
+
+
+def test_expired_code_reports_expired(store, clock):
+    store.issue("a@example.com", "123456", 600)
+    clock.now += 601
+    # Another caller triggering a sweep/purge must not turn "expired" into "missing".
+    store.issue("b@example.com", "654321", 600)
+    assert store.verify("a@example.com", "123456") == OTP_EXPIRED
+    assert store.verify("a@example.com", "123456") == OTP_MISSING
+
+
+def test_expired_code_is_purged_after_retention(store, clock):
+    store.issue("a@example.com", "123456", 600)
+    clock.now += 600 + otp_store.EXPIRED_CODE_RETENTION_SECONDS + 120
+    store.issue("b@example.com", "654321", 600)
+    assert store.verify("a@example.com", "123456") == OTP_MISSING
+
+
+def test_code_is_deleted_after_max_failed_attempts(store):
+    store.issue("a@example.com", "123456", 600)
+    assert store.verify("a@example.com", "000000", max_attempts=3) == OTP_INVALID
+    assert store.verify("a@example.com", "000001", max_attempts=3) == OTP_INVALID
+    assert store.verify("a@example.com", "000002", max_attempts=3) == OTP_LOCKED
+    assert store.verify("a@example.com", "123456", max_attempts=3) == OTP_MISSING
+
+
+def test_reissue_resets_failed_attempts(store):
+    store.issue("a@example.com", "123456", 600)
+    assert store.verify("a@example.com", "000000", max_attempts=2) == OTP_INVALID
+    store.issue("a@example.com", "222222", 600)
+    assert store.verify("a@example.com", "000000", max_attempts=2) == OTP_INVALID
+    assert store.verify("a@example.com", "222222", max_attempts=2) == OTP_OK
+
+
+def test_store_interface_is_abstract():
+    class Partial(OTPStore):
+        def issue(self, email, code, ttl_seconds):
+            pass
+
+    with pytest.raises(TypeError):
+        OTPStore()
+    with pytest.raises(TypeError):
+        Partial()
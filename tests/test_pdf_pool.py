@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import pytest
+
+from utils.pdf_pool import PdfExtractionPool, PdfExtractionTimeout
+
+# Jobs are plain `time.sleep` calls: picklable, and importable in spawned workers.
+
+
+async def _warm(pool):
+    # Worker start-up under "spawn" takes a while; keep it out of the timed part of each test.
+    await asyncio.gather(*(pool.run(time.sleep, 0) for _ in range(pool.max_workers)))
+
+
+def test_time_spent_queued_does_not_count_against_the_timeout():
+    async def scenario():
+        pool = PdfExtractionPool(max_workers=1, max_pending=8, timeout_seconds=1.5)
+        try:
+            await _warm(pool)
+            # The short documents wait ~1 s behind the long one, then finish well inside the timeout.
+            return await asyncio.gather(pool.run(time.sleep, 1.0), *(pool.run(time.sleep, 0.2) for _ in range(3)))
+        finally:
+            pool.shutdown()
+
+    assert asyncio.run(scenario()) == [None] * 4
+
+
+def test_timeout_kills_the_worker_and_frees_its_slot():
+    async def scenario():
+        pool = PdfExtractionPool(max_workers=1, max_pending=2, timeout_seconds=1.0)
+        try:
+            await _warm(pool)
+            started = time.perf_counter()
+            with pytest.raises(PdfExtractionTimeout):
+                await pool.run(time.sleep, 30)
+            assert time.perf_counter() - started < 5
+            deadline = time.perf_counter() + 5
+            while pool.pending and time.perf_counter() < deadline:
+                await asyncio.sleep(0.05)
+            assert pool.pending == 0
+            # A fresh executor serves the next document.
+            await pool.run(time.sleep, 0)
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_running_document_killed_by_a_recycle_is_resubmitted():
+    async def scenario():
+        pool = PdfExtractionPool(max_workers=2, max_pending=4, timeout_seconds=3.0)
+        try:
+            await _warm(pool)
+
+            async def hostile():
+                with pytest.raises(PdfExtractionTimeout):
+                    await pool.run(time.sleep, 30)
+
+            async def normal():
+                # Still running when the hostile document times out and its executor is recycled.
+                await asyncio.sleep(2.0)
+                await pool.run(time.sleep, 1.5)
+
+            await asyncio.gather(hostile(), normal())
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_queued_documents_cancelled_by_a_recycle_are_resubmitted():
+    async def scenario():
+        pool = PdfExtractionPool(max_workers=1, max_pending=8, timeout_seconds=10.0)
+        try:
+            await _warm(pool)
+            # Let several documents into the executor's own queue, as a recycle can race with submission.
+            pool._running = asyncio.Semaphore(8)
+            tasks = [asyncio.create_task(pool.run(time.sleep, 0.3)) for _ in range(4)]
+            await asyncio.sleep(0.1)
+            pool._retire_executor(pool._executor)
+            return await asyncio.gather(*tasks)
+        finally:
+            pool.shutdown()
+
+    assert asyncio.run(scenario()) == [None] * 4
@@ -0,0 +1,311 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def approx_size(value):
+    """Rough in-memory footprint used for byte budgets (UTF-8 length of the JSON form)."""
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8", "ignore"))
+    try:
+        return len(json.dumps(value, default=str).encode("utf-8", "ignore"))
+    except (TypeError, ValueError):
+        return 256
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and a total byte budget.
+
+    `ttl_seconds=None` disables expiry and `max_bytes=None` disables the byte cap.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds=3600.0, max_bytes=None, sizeof=approx_size):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        """Membership test that does not touch LRU order or the hit/miss counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[2] is None or entry[2] > time.monotonic())
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Never let one oversized value flush the whole cache.
+            return False
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+        return True
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._drop(key)
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+class SQLiteCacheTier:
+    """
+    Persistent second-level cache so warm entries survive restarts. Values are stored as JSON.
+
+    Writes never touch the database on the caller's thread: `set`, `delete` and the
+    access-time updates made by `get` are queued for one writer thread, which
+    commits them in batches, purges expired rows every `purge_interval_seconds`
+    and evicts least recently used rows beyond `max_entries` / `max_bytes`. When
+    the queue is full a write is dropped, which for a cache only costs a miss.
+    `get` reads through its own connection: in WAL mode it sees the last commit
+    without waiting for the writer's lock or an in-progress batch.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        ttl_seconds=None,
+        max_entries: int = 10000,
+        max_bytes: int = 256 * 1024 * 1024,
+        purge_interval_seconds: float = 300.0,
+        max_queue: int = 1000,
+    ):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.purge_interval_seconds = purge_interval_seconds
+        self._lock = threading.Lock()
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cache_entries)")}
+        # Tables created before the size cap lack these; backfill them once.
+        if "size" not in columns:
+            self._conn.execute("ALTER TABLE cache_entries ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE cache_entries SET size = length(CAST(value AS BLOB))")
+        if "accessed_at" not in columns:
+            self._conn.execute("ALTER TABLE cache_entries ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries (accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_expires ON cache_entries (expires_at)")
+        self._conn.commit()
+        self._read_lock = threading.Lock()
+        self._reader = sqlite3.connect(db_path, check_same_thread=False)
+        self._reader.execute("PRAGMA query_only = ON")
+        self._pending = queue.Queue(maxsize=max(1, max_queue))
+        self._next_purge = 0.0
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="cache-tier-writer", daemon=True)
+        self._writer.start()
+
+    def get(self, namespace: str, key: str):
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            self.delete(namespace, key)
+            return None
+        self._enqueue(("touch", namespace, key, now))
+        return json.loads(value)
+
+    def set(self, namespace: str, key: str, value):
+        now = time.time()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds else None
+        encoded = json.dumps(value)
+        self._enqueue(("set", namespace, key, encoded, expires_at, len(encoded.encode("utf-8")), now))
+
+    def delete(self, namespace: str, key: str):
+        self._enqueue(("delete", namespace, key))
+
+    def _enqueue(self, op):
+        if self._closed:
+            return
+        try:
+            self._pending.put_nowait(op)
+        except queue.Full:
+            pass
+
+    def _write_loop(self):
+        while True:
+            op = self._pending.get()
+            if op is None:
+                return
+            batch = [op]
+            stopping = False
+            while len(batch) < 256:
+                try:
+                    op = self._pending.get_nowait()
+                except queue.Empty:
+                    break
+                if op is None:
+                    stopping = True
+                    break
+                batch.append(op)
+            try:
+                self._apply([op for op in batch if op[0] != "flush"])
+            except sqlite3.Error:
+                # A cache write failing (disk full, locked file) must not stop the writer.
+                pass
+            for op in batch:
+                if op[0] == "flush":
+                    op[1].set()
+            if stopping:
+                return
+
+    def _apply(self, batch):
+        with self._lock:
+            with self._conn:
+                for op in batch:
+                    if op[0] == "set":
+                        _, namespace, key, encoded, expires_at, size, now = op
+                        self._conn.execute(
+                            """
+                            INSERT INTO cache_entries (namespace, key, value, expires_at, size, accessed_at)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                            ON CONFLICT (namespace, key) DO UPDATE SET
+                                value = excluded.value, expires_at = excluded.expires_at,
+                                size = excluded.size, accessed_at = excluded.accessed_at
+                            """,
+                            (namespace, key, encoded, expires_at, size, now),
+                        )
+                    elif op[0] == "touch":
+                        _, namespace, key, now = op
+                        self._conn.execute(
+                            "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                            (now, namespace, key),
+                        )
+                    else:
+                        _, namespace, key = op
+                        self._conn.execute(
+                            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                            (namespace, key),
+                        )
+                now = time.time()
+                if now >= self._next_purge:
+                    self._next_purge = now + self.purge_interval_seconds
+                    self._purge_expired(now)
+                self._evict()
+
+    def _purge_expired(self, now: float):
+        self._conn.execute(
+            "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (now,),
+        )
+
+    def _evict(self):
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+        excess_entries = count - self.max_entries
+        excess_bytes = total - self.max_bytes if self.max_bytes is not None else 0
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return
+        doomed = []
+        for rowid, size in self._conn.execute("SELECT rowid, size FROM cache_entries ORDER BY accessed_at"):
+            if excess_entries <= 0 and excess_bytes <= 0:
+                break
+            doomed.append((rowid,))
+            excess_entries -= 1
+            excess_bytes -= size
+        self._conn.executemany("DELETE FROM cache_entries WHERE rowid = ?", doomed)
+
+    def purge_expired(self):
+        with self._lock:
+            with self._conn:
+                self._purge_expired(time.time())
+
+    def flush(self, timeout_seconds: float = 5.0):
+        """Wait until queued writes are committed (used at shutdown and in checks)."""
+        done = threading.Event()
+        self._enqueue(("flush", done))
+        done.wait(timeout_seconds)
+
+    def close(self, timeout_seconds: float = 5.0):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._pending.put(None, timeout=timeout_seconds)
+        except queue.Full:
+            pass
+        self._writer.join(timeout_seconds)
+        with self._read_lock:
+            self._reader.close()
+        with self._lock:
+            self._conn.close()
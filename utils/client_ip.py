@@ -0,0 +1,15 @@
+def client_ip(request, trusted_proxy_hops: int = 0) -> str:
+    """
+    Address of the client that sent `request`.
+
+    Behind `trusted_proxy_hops` reverse proxies that each append the address
+    they received the request from to X-Forwarded-For, the client is the entry
+    that many positions from the right; entries further left are supplied by
+    the client and cannot be trusted. With no trusted proxies, or when the
+    header is shorter than expected, the socket peer address is used.
+    """
+    if trusted_proxy_hops > 0:
+        forwarded = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",") if part.strip()]
+        if len(forwarded) >= trusted_proxy_hops:
+            return forwarded[-trusted_proxy_hops]
+    return request.client.host if request.client else "unknown"
@@ -0,0 +1,162 @@
+import logging
+import queue
+import smtplib
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class MailQueueFull(Exception):
+    """Raised when the outbound queue already holds `max_queue` messages."""
+
+
+class SMTPMailer:
+    """
+    Background SMTP sender with one persistent, reused session.
+
+    `send` only enqueues, so request handlers never wait on the mail server. A
+    single worker thread keeps the SMTP connection (STARTTLS + login) open between
+    messages, drains bursts of up to `batch_size` queued messages over that one
+    session, and closes it after `idle_timeout_seconds` without mail. A failed
+    delivery reconnects and is retried up to `max_retries` times with exponential
+    backoff before the message is dropped and counted in `stats()["failed"]`.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str = "",
+        password: str = "",
+        use_starttls: bool = True,
+        timeout_seconds: float = 15.0,
+        max_queue: int = 100,
+        batch_size: int = 20,
+        max_retries: int = 3,
+        backoff_seconds: float = 1.0,
+        idle_timeout_seconds: float = 60.0,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_starttls = use_starttls
+        self.timeout_seconds = timeout_seconds
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max(0, max_retries)
+        self.backoff_seconds = backoff_seconds
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.sent = 0
+        self.failed = 0
+        self.last_error = ""
+        self._queue = queue.Queue(maxsize=max(1, max_queue))
+        self._session = None
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="smtp-mailer", daemon=True)
+        self._worker.start()
+
+    def send(self, message):
+        if self._closed:
+            raise RuntimeError("Mailer is closed.")
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            raise MailQueueFull("Outbound email queue is full. Try again shortly.")
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "connected": self._session is not None,
+            "last_error": self.last_error,
+        }
+
+    def _run(self):
+        while True:
+            try:
+                message = self._queue.get(timeout=self.idle_timeout_seconds)
+            except queue.Empty:
+                self._disconnect()
+                continue
+            if message is _STOP:
+                break
+            batch = [message]
+            stopping = False
+            while len(batch) < self.batch_size:
+                try:
+                    message = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if message is _STOP:
+                    stopping = True
+                    break
+                batch.append(message)
+            for message in batch:
+                self._deliver(message)
+            if stopping:
+                break
+        self._disconnect()
+
+    def _deliver(self, message):
+        for attempt in range(self.max_retries + 1):
+            reused = self._session is not None
+            try:
+                self._connect().send_message(message)
+                self.sent += 1
+                return
+            except (smtplib.SMTPException, OSError) as exc:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                self._disconnect()
+                # A kept-alive session the server has since dropped is retried without waiting.
+                if attempt < self.max_retries and not reused:
+                    time.sleep(self.backoff_seconds * (2 ** attempt))
+        self.failed += 1
+        logger.warning("Dropping email to %s after %d attempts: %s", message["To"], self.max_retries + 1, self.last_error)
+
+    def _connect(self):
+        if self._session is not None:
+            return self._session
+        session = smtplib.SMTP(self.host, self.port, timeout=self.timeout_seconds)
+        try:
+            session.ehlo()
+            if self.use_starttls:
+                session.starttls()
+                session.ehlo()
+            if self.user:
+                if not session.has_extn("auth"):
+                    # Sending unauthenticated would hide a misconfigured server or a stripped STARTTLS.
+                    raise smtplib.SMTPNotSupportedError(
+                        f"SMTP credentials are configured but {self.host}:{self.port} does not advertise AUTH."
+                    )
+                session.login(self.user, self.password)
+        except BaseException:
+            session.close()
+            raise
+        self._session = session
+        return session
+
+    def _disconnect(self):
+        session, self._session = self._session, None
+        if session is None:
+            return
+        try:
+            session.quit()
+        except (smtplib.SMTPException, OSError):
+            session.close()
+
+    def close(self, timeout_seconds: float = 10.0):
+        """Stop accepting mail and deliver what is already queued, waiting at most `timeout_seconds`."""
+        if self._closed:
+            return
+        self._closed = True
+        deadline = time.monotonic() + timeout_seconds
+        try:
+            self._queue.put(_STOP, timeout=timeout_seconds)
+        except queue.Full:
+            # The worker is stuck on an unresponsive server; it is a daemon thread, so just stop waiting.
+            return
+        self._worker.join(max(0.0, deadline - time.monotonic()))
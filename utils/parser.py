@@ -1,19 +1,46 @@
 import io
+import os
+from itertools import islice
 from PyPDF2 import PdfReader
 
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
+def iter_pdf_pages(source, max_pages: int = None):
     """
-    Extract text from uploaded PDF file.
+    Yield the text of each non-empty page, one page at a time.
+    `source` may be PDF bytes, a file path or a binary file object.
     """
-    pdf_stream = io.BytesIO(file_bytes)
-    reader = PdfReader(pdf_stream)
+    if isinstance(source, (str, os.PathLike)):
+        # Keep the file open for the whole walk so PyPDF2 reads objects on demand
+        # instead of copying the document into memory.
+        with open(source, "rb") as pdf_file:
+            yield from iter_pdf_pages(pdf_file, max_pages)
+        return
 
-    text = ""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
 
-    for page in reader.pages:
+    reader = PdfReader(source)
+    pages = reader.pages if max_pages is None else islice(reader.pages, max_pages)
+    for page in pages:
         page_text = page.extract_text()
         if page_text:
-            text += page_text + "\n"
+            yield page_text
+
+
+def extract_text_from_pdf(source, max_pages: int = None, max_chars: int = None) -> str:
+    """
+    Extract text from uploaded PDF file.
+    Stops early once `max_pages` pages or `max_chars` characters have been read.
+    """
+    parts = []
+    total_chars = 0
+
+    for page_text in iter_pdf_pages(source, max_pages):
+        chunk = page_text + "\n"
+        if max_chars is not None and total_chars + len(chunk) >= max_chars:
+            parts.append(chunk[: max_chars - total_chars])
+            break
+        parts.append(chunk)
+        total_chars += len(chunk)
 
-    return text
\ No newline at end of file
+    return "".join(parts)
@@ -0,0 +1,164 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.parser import extract_text_from_pdf
+
+
+class PdfPoolSaturated(Exception):
+    """Raised when every extraction slot (running + queued) is taken."""
+
+
+class PdfExtractionTimeout(Exception):
+    """Raised when a single document exceeds the per-document timeout."""
+
+
+class PdfExtractionPool:
+    """
+    Runs PyPDF2 extraction in worker processes so large PDFs never block the event loop.
+
+    `max_pending` bounds running + queued documents. A slot is only released once the
+    worker actually finishes. Documents wait here until a worker is free and are
+    only then handed to the executor, so the per-document timeout covers the
+    extraction itself, not time spent queued. When a running document times out
+    its worker is killed (the executor is recycled), so a hostile PDF cannot hold
+    a worker or a slot past the timeout; other documents caught in the recycle
+    are resubmitted once.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 8, timeout_seconds: float = 20.0):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(self.max_workers, max_pending)
+        self.timeout_seconds = timeout_seconds
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._closed = False
+
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        # One permit per worker; held from submission until the worker is done with the document.
+        self._running = asyncio.Semaphore(self.max_workers)
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._closed:
+                raise RuntimeError("PDF extraction pool is shut down.")
+            if self._executor is None:
+                # "spawn" keeps workers independent of the server's threads and sockets.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _reset_executor(self):
+        with self._executor_lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _retire_executor(self, executor):
+        """
+        Replace `executor` and kill its workers.
+
+        A timed-out document keeps its worker busy until the process exits, so the
+        pool is recycled: new documents go to a fresh executor, and the old
+        workers are terminated, which also fails their futures and releases
+        their slots. ProcessPoolExecutor has no public handle on its processes,
+        hence `_processes`.
+        """
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            if process.is_alive():
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _try_acquire(self):
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                return False
+            self._pending += 1
+            return True
+
+    def _release(self, _future=None):
+        with self._pending_lock:
+            self._pending = max(0, self._pending - 1)
+
+    async def _submit(self, fn, *args):
+        """Wait for a free worker, then submit; the returned future holds the worker permit until done."""
+        loop = asyncio.get_running_loop()
+        await self._running.acquire()
+        try:
+            executor = self._get_executor()
+            future = executor.submit(fn, *args)
+        except BaseException:
+            self._running.release()
+            raise
+
+        def release_worker(_future):
+            try:
+                loop.call_soon_threadsafe(self._running.release)
+            except RuntimeError:
+                # The loop is already closed; nothing is waiting on the permit any more.
+                pass
+
+        future.add_done_callback(release_worker)
+        return executor, future
+
+    async def run(self, fn, *args):
+        if not self._try_acquire():
+            raise PdfPoolSaturated(
+                f"PDF extraction queue is full ({self.max_pending} documents in progress)."
+            )
+        future = None
+        try:
+            # One retry covers documents whose workers were killed, or whose queued job was
+            # cancelled, because a different document on the same executor timed out or crashed it.
+            for attempt in range(2):
+                executor, future = await self._submit(fn, *args)
+                try:
+                    return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout_seconds)
+                except asyncio.TimeoutError:
+                    if future.running():
+                        self._retire_executor(executor)
+                    else:
+                        future.cancel()
+                    raise PdfExtractionTimeout(
+                        f"PDF extraction exceeded {self.timeout_seconds:g} seconds."
+                    ) from None
+                except asyncio.CancelledError:
+                    if not future.cancelled() or asyncio.current_task().cancelling():
+                        raise
+                    # Cancelled by a recycle (shutdown with cancel_futures), not by our caller.
+                    if attempt == 0:
+                        continue
+                    raise BrokenProcessPool("PDF extraction was cancelled by an executor recycle.") from None
+                except BrokenProcessPool:
+                    # A worker died (e.g. OOM on a hostile PDF, or killed by another document's
+                    # timeout); later documents get a fresh pool.
+                    self._retire_executor(executor)
+                    if attempt == 0:
+                        continue
+                    raise
+        finally:
+            # The slot is held until the last submitted document has actually finished.
+            if future is None:
+                self._release()
+            else:
+                future.add_done_callback(self._release)
+
+    async def extract_text(self, source, max_pages: int = None, max_chars: int = None) -> str:
+        # `source` is PDF bytes or a path to a spooled upload; both pickle cheaply.
+        return await self.run(extract_text_from_pdf, source, max_pages, max_chars)
+
+    def shutdown(self):
+        self._reset_executor()
@@ -0,0 +1,88 @@
+import asyncio
+import inspect
+import time
+
+
+class StageGraph:
+    """
+    Small dependency graph of pipeline stages.
+
+    Each stage is a callable that receives the results of the stages it depends
+    on as keyword arguments (by stage name), so intermediate results are computed
+    once and shared. `run` executes stages as soon as their dependencies finish:
+    plain functions on `executor` (inline when it is None), coroutine functions
+    on the event loop. Given `targets`, only those stages and what they depend on
+    run. It returns the results and each stage's wall time in ms.
+    """
+
+    def __init__(self):
+        self._stages = {}
+
+    def add(self, name: str, fn, *deps: str):
+        if name in self._stages:
+            raise ValueError(f"Stage {name!r} is already defined.")
+        missing = [dep for dep in deps if dep not in self._stages]
+        if missing:
+            # Dependencies must be added first, which also rules out cycles.
+            raise ValueError(f"Stage {name!r} depends on undefined stage(s): {', '.join(missing)}.")
+        self._stages[name] = (fn, deps)
+        return self
+
+    def closure(self, targets):
+        """Names of `targets` and every stage they transitively depend on."""
+        unknown = [name for name in targets if name not in self._stages]
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(unknown)}.")
+        needed = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self._stages[name][1])
+        return needed
+
+    async def run(self, executor=None, targets=None):
+        loop = asyncio.get_running_loop()
+        results = {}
+        timings_ms = {}
+        if targets is None:
+            pending = dict(self._stages)
+        else:
+            needed = self.closure(targets)
+            pending = {name: stage for name, stage in self._stages.items() if name in needed}
+        running = {}
+
+        def timed(name, fn, kwargs):
+            started = time.perf_counter()
+            value = fn(**kwargs)
+            timings_ms[name] = round((time.perf_counter() - started) * 1000, 3)
+            return value
+
+        async def timed_async(name, fn, kwargs):
+            started = time.perf_counter()
+            value = await fn(**kwargs)
+            timings_ms[name] = round((time.perf_counter() - started) * 1000, 3)
+            return value
+
+        try:
+            while pending or running:
+                ready = [name for name, (_, deps) in pending.items() if all(dep in results for dep in deps)]
+                for name in ready:
+                    fn, deps = pending.pop(name)
+                    kwargs = {dep: results[dep] for dep in deps}
+                    if inspect.iscoroutinefunction(fn):
+                        running[asyncio.ensure_future(timed_async(name, fn, kwargs))] = name
+                    elif executor is None:
+                        results[name] = timed(name, fn, kwargs)
+                    else:
+                        running[loop.run_in_executor(executor, timed, name, fn, kwargs)] = name
+                if not running:
+                    continue
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+        finally:
+            for future in running:
+                future.cancel()
+        return results, timings_ms
@@ -0,0 +1,96 @@
+import heapq
+import re
+from collections import Counter
+from functools import lru_cache
+
+# Tokens only contain [a-z0-9+#.], so only "." and then "+"/"#" can be edge punctuation.
+_TOKEN_RE = re.compile(r"[a-z0-9+#.]+")
+_EDGE_CHARS = frozenset("+#.")
+
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "have", "has",
+    "your", "you", "our", "are", "was", "were", "into", "about", "their",
+    "them", "then", "than", "been", "also", "but", "can", "will", "would",
+    "could", "should", "using", "used", "use", "explain", "experience"
+}
+
+
+def _clean_tokens(lowered: str, stopwords, min_length: int):
+    tokens = []
+    append = tokens.append
+    for token in _TOKEN_RE.findall(lowered):
+        if token[0] in _EDGE_CHARS or token[-1] in _EDGE_CHARS:
+            token = token.strip(".").strip("+#")
+        if len(token) > min_length and token not in stopwords:
+            append(token)
+    return tokens
+
+
+def iter_top_terms(counts, skip=None):
+    """
+    Yield (term, count) pairs by descending count, ties broken by term, as
+    `sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))` would.
+
+    The heap is built in O(n) and each pop costs O(log n), so a caller that
+    stops after the first k accepted terms never pays for a full sort. Terms for
+    which `skip(term)` is true are left out of the heap.
+    """
+    heap = [(-count, term) for term, count in counts.items() if skip is None or not skip(term)]
+    heapq.heapify(heap)
+    while heap:
+        count, term = heapq.heappop(heap)
+        yield term, -count
+
+
+class TokenizedDocument:
+    """
+    A text tokenized once, with every view the analysis stages need.
+
+    One regex pass over the lowercased text yields `tokens` (in order); `counts`
+    (token frequencies) is tallied from that list in C, and `vocabulary` is the
+    set-like key view of `counts`, so it costs nothing extra. `offsets` (start,
+    end of each token in `lowered`) needs match positions, which are slower to
+    collect, so it is computed on first access. Tokens are trimmed of edge "."
+    then "+"/"#", and kept when longer than `min_length` characters and not in
+    `stopwords`.
+    """
+
+    __slots__ = ("text", "lowered", "tokens", "counts", "_stopwords", "_min_length", "_offsets")
+
+    def __init__(self, text: str, stopwords=frozenset(), min_length: int = 2):
+        self.text = text or ""
+        self.lowered = self.text.lower()
+        self._stopwords = stopwords
+        self._min_length = min_length
+        self._offsets = None
+        self.tokens = _clean_tokens(self.lowered, stopwords, min_length)
+        self.counts = Counter(self.tokens)
+
+    @property
+    def vocabulary(self):
+        return self.counts.keys()
+
+    @property
+    def offsets(self):
+        if self._offsets is None:
+            offsets = []
+            for match in _TOKEN_RE.finditer(self.lowered):
+                token = match.group()
+                start = match.start()
+                if token[0] in _EDGE_CHARS or token[-1] in _EDGE_CHARS:
+                    trimmed = token.strip(".")
+                    start += len(token) - len(token.lstrip(".")) + len(trimmed) - len(trimmed.lstrip("+#"))
+                    token = trimmed.strip("+#")
+                if len(token) > self._min_length and token not in self._stopwords:
+                    offsets.append((start, start + len(token)))
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self):
+        return len(self.tokens)
+
+
+@lru_cache(maxsize=64)
+def tokenize_document(text: str) -> TokenizedDocument:
+    """Shared, read-only tokenization of `text` (tokens, offsets, counts, vocabulary)."""
+    return TokenizedDocument(text, STOPWORDS)
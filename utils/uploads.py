@@ -0,0 +1,74 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+
+UPLOAD_CHUNK_BYTES = 256 * 1024
+
+
+class SpooledUpload:
+    """
+    An uploaded file read in chunks and hashed on the way through.
+
+    Small bodies stay in memory (`source` is bytes); anything past the spool
+    threshold is written to a temporary file and `source` is its path, which
+    can be handed to a worker process without copying the document.
+    """
+
+    def __init__(self, source, digest: str, size: int):
+        self.source = source
+        self.digest = digest
+        self.size = size
+
+    @property
+    def on_disk(self):
+        return isinstance(self.source, str)
+
+    def cleanup(self):
+        if self.on_disk:
+            try:
+                os.remove(self.source)
+            except OSError:
+                pass
+
+
+def _spool_file(fileobj, spool_threshold_bytes: int) -> SpooledUpload:
+    hasher = hashlib.sha256()
+    buffer = bytearray()
+    spool_file = None
+    size = 0
+
+    try:
+        while True:
+            chunk = fileobj.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            hasher.update(chunk)
+            size += len(chunk)
+
+            if spool_file is None and size <= spool_threshold_bytes:
+                buffer.extend(chunk)
+                continue
+            if spool_file is None:
+                spool_file = tempfile.NamedTemporaryFile(prefix="internpilot_", suffix=".pdf", delete=False)
+                spool_file.write(buffer)
+                buffer = None
+            spool_file.write(chunk)
+    except BaseException:
+        if spool_file is not None:
+            spool_file.close()
+            os.remove(spool_file.name)
+        raise
+
+    if spool_file is not None:
+        spool_file.close()
+        return SpooledUpload(spool_file.name, hasher.hexdigest(), size)
+    return SpooledUpload(bytes(buffer), hasher.hexdigest(), size)
+
+
+async def spool_upload(upload, spool_threshold_bytes: int = 1024 * 1024) -> SpooledUpload:
+    # The request body may already sit in a rolled-over temporary file, so the
+    # reads, hashing and copy all happen in one worker-thread call, off the loop.
+    upload.file.seek(0)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _spool_file, upload.file, spool_threshold_bytes)